@@ -15,14 +15,15 @@ AUTO_CONVERT_TO_EXCEL = True
 # ==================== zsxq知识星球配置 ====================
 STAR_ID = "48418411254128"  # 星球ID
 # 请在此处填入您的真实Cookie, 例如 "zsxq_access_token=ABC..."
-COOKIE = "“ # 认证Cookie
+COOKIE = ""  # 认证Cookie
 
 # zsxq API配置
 API_BASE_URL = "https://api.zsxq.com/v2/topics"
 API_HOST = "api.zsxq.com"
 API_TIMEOUT = 15  # 请求超时时间（秒）
 API_RETRY_TIMES = 5  # API重试次数
-API_RETRY_DELAY = (3, 5)  # 重试延迟范围（秒）
+API_RETRY_BACKOFF = (1, 30, 1)  # 重试退避 (基数, 上限, 随机抖动)：等待 min(上限, 基数*2^重试次数) + [0, 抖动) 秒
+API_TARGET_QPS = 1.0  # 分页请求的目标频率（次/秒），遇到429时自动降低
 MAX_TOPIC_PAGES = 50 # 获取话题的最大页数，防止无限循环
 
 
@@ -32,7 +33,10 @@ OPENAI_API_KEY = ""
 # 推荐使用DeepSeek, 或者根据需要替换为 "https://api.openai.com/v1"
 OPENAI_API_BASE = "https://api.deepseek.com"
 OPENAI_MODEL = "deepseek-chat"
-TEMPERATURE = 0.2  # 推荐0.2，平衡创意和准确性
+TEMPERATURE = 0  # 信息提取任务推荐0：相同输入得到相同输出，结果缓存才等价于重新请求
+LLM_SEED = 42  # 固定采样种子进一步提高输出的确定性，设为None则不传
+LLM_BATCH_SIZE = 8  # 每次LLM请求合并分析的话题数，设为1则逐条请求
+LLM_MAX_CONCURRENCY = 50  # 同时进行的LLM请求数上限
 
 
 # ==================== 日志配置 ====================
@@ -35,14 +35,18 @@ API_BASE_URL = "https://api.zsxq.com/v2/topics"  # API基础URL
 API_HOST = "api.zsxq.com"  # API主机地址
 API_TIMEOUT = 15  # 请求超时时间（秒）
 API_RETRY_TIMES = 5  # API重试次数
-API_RETRY_DELAY = (3, 5)  # 重试延迟范围（秒）
+API_RETRY_BACKOFF = (1, 30, 1)  # 重试退避 (基数, 上限, 随机抖动)：等待 min(上限, 基数*2^重试次数) + [0, 抖动) 秒；429响应优先按Retry-After等待
+API_TARGET_QPS = 1.0  # 分页请求的目标频率（次/秒），从上一页请求开始计时；遇到429时间隔加倍，之后逐步恢复
 
 # ==================== 其他配置保持不变 ====================
 # OpenAI API配置 (DeepSeek)
 OPENAI_API_KEY = "sk-your-api-key"
 OPENAI_API_BASE = "https://api.deepseek.com"
 OPENAI_MODEL = "deepseek-chat"
-TEMPERATURE = 0.2
+TEMPERATURE = 0  # 信息提取任务推荐0，相同输入得到相同输出
+LLM_SEED = 42  # 固定采样种子，设为None则不传
+LLM_BATCH_SIZE = 8  # 每次LLM请求合并分析的话题数（共用一份系统提示词），设为1则逐条请求
+LLM_MAX_CONCURRENCY = 50  # 同时进行的LLM请求数上限（异步请求，不占用线程）
 
 # 股价获取器配置
 USE_YFINANCE = True
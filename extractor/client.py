@@ -1,15 +1,19 @@
 """
 此模块负责从zsxq API获取话题数据
 """
+import asyncio
+import bisect
+import logging
 import time
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Tuple
 import random
 
-import requests
+import aiohttp
 
-from config import STAR_ID, COOKIE, API_BASE_URL, API_HOST, API_TIMEOUT, API_RETRY_TIMES, API_RETRY_DELAY, MAX_TOPIC_PAGES
-from utils import get_logger
+from config import STAR_ID, COOKIE, API_BASE_URL, API_HOST, API_TIMEOUT, API_RETRY_TIMES, API_RETRY_BACKOFF, API_TARGET_QPS, MAX_TOPIC_PAGES
+from utils import get_logger, json_loads
 
 # 设置日志器
 logger = get_logger(__name__)
@@ -55,115 +59,219 @@ def 获取日期范围(起始日期: str):
     
     return 开始时间.isoformat(), 结束时间.isoformat()
 
-def 获取话题页面(结束时间: str = "", 仅今日: bool = True, 起始日期: str = "") -> Dict[str, Any]:
-    """
-    从zsxq API获取单页话题数据
-
-    参数:
-        结束时间 (str): 用于分页的结束时间，为空则获取最新话题
-        仅今日 (bool): 是否只过滤今日话题（在客户端过滤）
-        起始日期 (str): 过滤的开始日期 (YYYY-MM-DD格式)，为空则不使用（在客户端过滤）
+# 不随请求变化的请求头，设置在会话上，每次请求只需附带动态部分
+_静态请求头: Dict[str, str] = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Encoding": "gzip, deflate, br, zstd",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Host": API_HOST,
+    "Origin": "https://wx.zsxq.com",
+    "Pragma": "no-cache",
+    "Priority": "u=1, i",
+    "Referer": "https://wx.zsxq.com/",
+    "Sec-Ch-Ua": '"Google Chrome";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"macOS"',
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-site",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
+    "X-Aduid": "f0185a8e3-7586-5bcf-7a8d-ebd0fdf0854",
+    "X-Version": "2.77.0"
+}
 
-    返回:
-        Dict[str, Any]: API返回的JSON响应
+def _构建动态请求头() -> Dict[str, str]:
+    """
+    构建每次请求都需要重新生成的请求头（Cookie、时间戳和请求ID）
     """
     # 生成时间戳（当前时间的Unix时间戳）
-    import time as time_module
-    timestamp = str(int(time_module.time()))
+    timestamp = str(int(time.time()))
     
-    请求头 = {
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
+    return {
         "Cookie": COOKIE,
-        "Host": API_HOST,
-        "Origin": "https://wx.zsxq.com",
-        "Pragma": "no-cache",
-        "Priority": "u=1, i",
-        "Referer": "https://wx.zsxq.com/",
-        "Sec-Ch-Ua": '"Google Chrome";v="137", "Chromium";v="137", "Not/A)Brand";v="24"',
-        "Sec-Ch-Ua-Mobile": "?0",
-        "Sec-Ch-Ua-Platform": '"macOS"',
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-site",
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
-        "X-Aduid": "f0185a8e3-7586-5bcf-7a8d-ebd0fdf0854",
         "X-Request-Id": f"req_{timestamp}_{hash(timestamp) % 100000:05d}",
         "X-Timestamp": timestamp,
-        "X-Version": "2.77.0"
     }
+
+def _构建请求参数(结束时间: str) -> Dict[str, Any]:
+    """
+    构建分页请求参数，只添加分页的结束时间，不使用begin_time和end_time范围过滤避免格式错误
+    """
     参数 = {
         "scope": "all",
         "count": 20,
     }
-    
-    # 只添加分页的结束时间，移除begin_time和end_time避免格式错误
     if 结束时间:
         参数["end_time"] = 结束时间
+    return 参数
+
+def _话题网址() -> str:
+    """
+    返回当前星球的话题列表API地址
+    """
+    return API_BASE_URL.replace("/v2/topics", f"/v2/groups/{STAR_ID}/topics")
+
+def _解析Retry_After(值: Optional[str]) -> Optional[float]:
+    """
+    解析Retry-After响应头，支持秒数和HTTP日期两种格式
+    
+    参数:
+        值 (Optional[str]): Retry-After响应头的原始值
+        
+    返回:
+        Optional[float]: 需要等待的秒数，缺失或无法解析时为 None
+    """
+    if not 值:
+        return None
+    值 = 值.strip()
+    if 值.isdigit():
+        return float(值)
+    try:
+        重试时间 = parsedate_to_datetime(值)
+    except (TypeError, ValueError):
+        return None
+    if 重试时间.tzinfo is None:
+        重试时间 = 重试时间.replace(tzinfo=timezone.utc)
+    return max(0.0, (重试时间 - datetime.now(timezone.utc)).total_seconds())
+
+def _计算退避时间(重试次数: int) -> float:
+    """
+    指数退避加随机抖动：min(上限, 基数 * 2^重试次数) + [0, 抖动)
+    
+    参数:
+        重试次数 (int): 已失败的次数（从0开始）
+    """
+    基数, 上限, 抖动 = API_RETRY_BACKOFF
+    return min(上限, 基数 * 2 ** 重试次数) + random.uniform(0, 抖动)
+
+def _计算重试等待时间(重试次数: int, 状态码: Optional[int], retry_after: Optional[str] = None) -> float:
+    """
+    计算请求失败后的重试等待时间（秒）
+    
+    参数:
+        重试次数 (int): 已失败的次数（从0开始）
+        状态码 (Optional[int]): 失败响应的HTTP状态码，网络错误等无响应时为 None
+        retry_after (Optional[str]): 失败响应的Retry-After头
+    """
+    # 如果是429，优先按服务器给出的Retry-After等待
+    if 状态码 == 429:
+        等待时间 = _解析Retry_After(retry_after)
+        if 等待时间 is None:
+            等待时间 = _计算退避时间(重试次数)
+        logger.warning(f"请求频率受限 (429)，将在 {等待时间:.1f} 秒后重试...")
+        return 等待时间
+    等待时间 = _计算退避时间(重试次数)
+    logger.info(f"将在 {等待时间:.1f} 秒后重试...")
+    return 等待时间
+
+class _自适应节流器:
+    """
+    按目标QPS控制相邻分页请求的间隔（从上一次请求开始时计时，请求本身的耗时也计入间隔）
+
+    遇到429时间隔加倍，之后每次成功逐步缩短，恢复到目标QPS对应的间隔
+    """
+
+    def __init__(self, 目标QPS: float):
+        self.基础间隔 = 1.0 / 目标QPS if 目标QPS > 0 else 0.0
+        self.间隔 = self.基础间隔
+        self._上次开始: Optional[float] = None
+
+    async def 等待(self):
+        """等待到距上一次请求开始满一个间隔，并记录本次请求的开始时间"""
+        if self._上次开始 is not None:
+            剩余 = self.间隔 - (time.monotonic() - self._上次开始)
+            if 剩余 > 0:
+                await asyncio.sleep(剩余)
+        self._上次开始 = time.monotonic()
+
+    def 遇到限流(self):
+        """收到429后加倍间隔，不超过退避上限"""
+        self.间隔 = min(max(self.间隔 * 2, self.基础间隔, 0.5), API_RETRY_BACKOFF[1])
+        logger.info(f"请求频率受限，分页间隔调整为 {self.间隔:.1f} 秒")
+
+    def 请求成功(self):
+        """请求成功后逐步缩短间隔，直到恢复基础间隔"""
+        if self.间隔 > self.基础间隔:
+            self.间隔 = max(self.基础间隔, self.间隔 * 0.8)
+
+def _记录响应概况(json_data: Dict[str, Any]):
+    """
+    调试日志：记录响应中的话题数量
+    """
+    if "resp_data" in json_data and "topics" in json_data["resp_data"]:
+        topics_count = len(json_data["resp_data"]["topics"])
+        logger.debug("成功获取API响应，包含 %d 个话题", topics_count)
+
+async def 获取话题页面_async(会话: aiohttp.ClientSession, 结束时间: str = "", 仅今日: bool = True, 起始日期: str = "", 节流器: Optional[_自适应节流器] = None) -> Dict[str, Any]:
+    """
+    从zsxq API获取单页话题数据（异步版本，复用同一个会话的连接池和keep-alive连接）
+
+    参数:
+        会话 (aiohttp.ClientSession): 共享的aiohttp会话
+        结束时间 (str): 用于分页的结束时间，为空则获取最新话题
+        仅今日 (bool): 是否只过滤今日话题（在客户端过滤）
+        起始日期 (str): 过滤的开始日期 (YYYY-MM-DD格式)，为空则不使用（在客户端过滤）
+        节流器 (Optional[_自适应节流器]): 分页请求共用的节流器，收到429时通知其降低请求频率
 
-    网址 = API_BASE_URL.replace("/v2/topics", f"/v2/groups/{STAR_ID}/topics")
+    返回:
+        Dict[str, Any]: API返回的JSON响应
+    """
+    参数 = _构建请求参数(结束时间)
+    网址 = _话题网址()
 
     for attempt in range(API_RETRY_TIMES):
         try:
-            logger.debug(f"正在获取话题 (尝试 {attempt + 1}/{API_RETRY_TIMES})，URL: {网址}")
-            logger.debug(f"请求参数: {参数}")
-            
-            响应 = requests.get(网址, headers=请求头, params=参数, timeout=API_TIMEOUT)
+            logger.debug("正在获取话题 (尝试 %d/%d)，URL: %s", attempt + 1, API_RETRY_TIMES, 网址)
+            logger.debug("请求参数: %s", 参数)
             
-            # 永久性错误，直接失败，不重试
-            if 响应.status_code in [401, 403]:
-                logger.error(f"API请求失败，状态码: {响应.status_code}。请检查Cookie或权限。停止重试。")
-                return {}
+            async with 会话.get(网址, headers=_构建动态请求头(), params=参数) as 响应:
+                # 永久性错误，直接失败，不重试
+                if 响应.status in [401, 403]:
+                    logger.error(f"API请求失败，状态码: {响应.status}。请检查Cookie或权限。停止重试。")
+                    return {}
 
-            # 其他客户端或服务器错误，触发重试
-            响应.raise_for_status()
-            
-            # 成功获取响应
-            json_data = 响应.json()
-            if "resp_data" in json_data and "topics" in json_data["resp_data"]:
-                topics_count = len(json_data["resp_data"]["topics"])
-                logger.debug(f"成功获取API响应，包含 {topics_count} 个话题")
+                # 其他客户端或服务器错误，触发重试
+                响应.raise_for_status()
+                
+                # 成功获取响应
+                json_data = json_loads(await 响应.read())
+            _记录响应概况(json_data)
             return json_data
 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
             logger.warning(f"获取话题时出错 (尝试 {attempt + 1}/{API_RETRY_TIMES}): {e}")
             
             if attempt < API_RETRY_TIMES - 1:
-                sleep_time = random.uniform(*API_RETRY_DELAY)
-                # 如果是429，则等待更长时间
-                if isinstance(e, requests.exceptions.HTTPError) and e.response.status_code == 429:
-                    sleep_time = 60
-                    logger.warning(f"请求频率受限 (429)，将在 {sleep_time} 秒后重试...")
+                if isinstance(e, aiohttp.ClientResponseError):
+                    retry_after = e.headers.get("Retry-After") if e.headers else None
+                    if e.status == 429 and 节流器 is not None:
+                        节流器.遇到限流()
+                    等待时间 = _计算重试等待时间(attempt, e.status, retry_after)
                 else:
-                    logger.info(f"将在 {sleep_time:.1f} 秒后重试...")
-                
-                time.sleep(sleep_time)
+                    等待时间 = _计算重试等待时间(attempt, None)
+                await asyncio.sleep(等待时间)
             else:
                 logger.error(f"经过 {API_RETRY_TIMES} 次尝试后，获取话题失败。")
 
     return {}
 
-
-def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
+async def 获取所有今日话题_async(起始日期: str = "") -> List[Dict[str, Any]]:
     """
     获取所有今日话题（或指定日期范围的话题）
     持续获取直到遇到昨天或更早日期的话题为止
 
+    所有分页请求共用一个aiohttp会话，复用连接而不必每页重新建立TCP/TLS连接。
+    分页是因果相关的（下一页的end_time取自上一页最后一个话题的时间），因此逐页顺序请求，
+    不做推测性的预取：推测的end_time几乎不会与真实值一致，只会在有频率限制的接口上浪费请求。
+
     参数:
         起始日期 (str): 过滤的开始日期 (YYYY-MM-DD格式)，为空则只获取今日话题
 
     返回:
         List[Dict[str, Any]]: 所有获取的话题列表
     """
-    所有话题 = []
-    结束时间 = ""
-    页码 = 1  # 从第1页开始
-    连续空响应次数 = 0  # 记录连续空响应的次数
-    最大重试次数 = API_RETRY_TIMES     # 最多重试次数
-    
     # 显著的分页开始日志
     logger.info("=" * 60)
     if 起始日期:
@@ -177,30 +285,100 @@ def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
     logger.info("📋 将持续获取直到遇到更早日期的话题")
     logger.info("=" * 60)
     
+    会话超时 = aiohttp.ClientTimeout(total=API_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=会话超时, headers=_静态请求头) as 会话:
+        所有话题, 页码 = await _分页获取话题(会话, 起始日期, 目标日期)
+
+    # 显著的分页总结日志
+    logger.info("=" * 60)
+    logger.info(f"📊 话题获取完成！总共获取了 【{len(所有话题)}个】 符合条件的话题")
+    logger.info(f"📋 共搜索了 【{页码 - 1}页】")
+    logger.info("=" * 60)
+    
+    return 所有话题
+
+def _前一毫秒(话题时间: str) -> str:
+    """
+    返回zsxq话题时间（如 2025-07-04T10:30:00.123+0800）减去1毫秒后的时间字符串，用作下一页的end_time
+
+    毫秒不为0时直接在字符串上递减；为0时需要向秒借位，才解析为datetime计算
+    
+    参数:
+        话题时间 (str): 话题的create_time
+        
+    返回:
+        str: 减去1毫秒后的时间，无法解析时原样返回
+    """
+    主体, 点, 毫秒和时区 = 话题时间.partition('.')
+    毫秒, 时区 = 毫秒和时区[:3], 毫秒和时区[3:]
+    if 点 and len(毫秒) == 3 and 毫秒.isdigit() and 时区:
+        if 毫秒 != "000":
+            return f"{主体}.{int(毫秒) - 1:03d}{时区}"
+        try:
+            前一时刻 = datetime.strptime(主体, "%Y-%m-%dT%H:%M:%S") - timedelta(milliseconds=1)
+            return 前一时刻.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + 时区
+        except ValueError:
+            pass
+    # 如果时间格式无法识别，直接使用原时间
+    logger.warning(f"无法解析话题时间 {话题时间!r}，直接用作下一页的结束时间")
+    return 话题时间
+
+def _统计不早于(降序日期列表: List[str], 日期: str, 包含相等: bool = True) -> int:
+    """
+    统计降序日期列表开头晚于（或等于）指定日期的元素个数
+
+    参数:
+        降序日期列表 (List[str]): 按降序排列的 YYYY-MM-DD 日期字符串
+        日期 (str): 比较的日期
+        包含相等 (bool): 是否把等于该日期的元素计入
+
+    返回:
+        int: 满足条件的前缀长度
+    """
+    升序日期列表 = 降序日期列表[::-1]
+    查找 = bisect.bisect_left if 包含相等 else bisect.bisect_right
+    return len(降序日期列表) - 查找(升序日期列表, 日期)
+
+async def _分页获取话题(会话: aiohttp.ClientSession, 起始日期: str, 目标日期: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    逐页获取话题直到遇到更早日期、连续空响应或达到最大页数
+
+    返回:
+        Tuple[List[Dict[str, Any]], int]: (符合条件的话题列表, 停止时的页码)
+    """
+    所有话题 = []
+    结束时间 = ""
+    页码 = 1  # 从第1页开始
+    连续空响应次数 = 0  # 记录连续空响应的次数
+    最大重试次数 = API_RETRY_TIMES     # 最多重试次数
+    节流器 = _自适应节流器(API_TARGET_QPS)
+
     while True:
         logger.info(f"🔍 正在获取第 【{页码}】 页话题...")
         
-        数据 = 获取话题页面(结束时间, True, 起始日期)
+        await 节流器.等待()  # 对API友好：按目标频率发起分页请求
+        数据 = await 获取话题页面_async(会话, 结束时间, True, 起始日期, 节流器)
         
-        # 添加详细的调试信息
-        logger.debug(f"API调用返回数据: {bool(数据)}")
-        if 数据:
-            logger.debug(f"数据结构: {list(数据.keys())}")
-            if "resp_data" in 数据:
-                resp_data = 数据["resp_data"]
-                logger.debug(f"resp_data类型: {type(resp_data)}, 内容: {resp_data is not None}")
-                if resp_data and isinstance(resp_data, dict):
-                    logger.debug(f"resp_data键: {list(resp_data.keys())}")
-                    if "topics" in resp_data:
-                        topics = resp_data.get("topics")
-                        logger.debug(f"topics类型: {type(topics)}, 长度: {len(topics) if topics else 'None'}")
+        # 添加详细的调试信息（仅在DEBUG级别开启时构建，避免每页做无用的格式化）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"API调用返回数据: {bool(数据)}")
+            if 数据:
+                logger.debug(f"数据结构: {list(数据.keys())}")
+                if "resp_data" in 数据:
+                    resp_data = 数据["resp_data"]
+                    logger.debug(f"resp_data类型: {type(resp_data)}, 内容: {resp_data is not None}")
+                    if resp_data and isinstance(resp_data, dict):
+                        logger.debug(f"resp_data键: {list(resp_data.keys())}")
+                        if "topics" in resp_data:
+                            topics = resp_data.get("topics")
+                            logger.debug(f"topics类型: {type(topics)}, 长度: {len(topics) if topics else 'None'}")
         
-        # 检查各个条件
-        条件1 = not 数据
-        条件2 = "resp_data" not in 数据 if 数据 else True
-        条件3 = not 数据["resp_data"].get("topics") if 数据 and "resp_data" in 数据 else True
+            # 检查各个条件
+            条件1 = not 数据
+            条件2 = "resp_data" not in 数据 if 数据 else True
+            条件3 = not 数据["resp_data"].get("topics") if 数据 and "resp_data" in 数据 else True
         
-        logger.debug(f"停止条件检查: not数据={条件1}, no_resp_data={条件2}, no_topics={条件3}")
+            logger.debug(f"停止条件检查: not数据={条件1}, no_resp_data={条件2}, no_topics={条件3}")
         
         # 🔄 新增重试逻辑：当API没有返回话题时，等待后重试
         if not 数据 or "resp_data" not in 数据 or not 数据["resp_data"].get("topics"):
@@ -211,44 +389,36 @@ def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
                 logger.warning(f"🚫 连续{最大重试次数}次没有获取到话题，停止获取")
                 break
             else:
-                等待时间 = random.uniform(*API_RETRY_DELAY)  # 随机等待
+                等待时间 = _计算退避时间(连续空响应次数 - 1)  # 指数退避加随机抖动
                 logger.info(f"⏰ 等待 {等待时间:.1f} 秒后重试...")
-                time.sleep(等待时间)
+                await asyncio.sleep(等待时间)
                 continue  # 重试当前页，页码不会增加
         
         # 成功获取数据后，重置计数器并处理数据
         连续空响应次数 = 0
+        节流器.请求成功()
         原始话题列表 = 数据["resp_data"]["topics"]
         原始数量 = len(原始话题列表)
         
         # 检查是否遇到更早的日期 - 这是新的关键逻辑
-        遇到更早日期 = False
-        符合条件话题 = []
+        # 话题按创建时间降序返回，二分查找日期边界即可，不必逐个比较
+        日期列表 = [话题.get("create_time", "")[:10] for 话题 in 原始话题列表]
+        截止日期 = 起始日期 or 目标日期
+        结束位置 = _统计不早于(日期列表, 截止日期)
+        遇到更早日期 = 结束位置 < 原始数量
         
-        for 话题 in 原始话题列表:
-            话题日期 = 话题.get("create_time", "")[:10]
-            
-            if 起始日期:
-                # 指定日期范围：只要是指定日期或之后的都要
-                if 话题日期 >= 起始日期:
-                    符合条件话题.append(话题)
-                else:
-                    # 遇到比起始日期更早的话题，停止
-                    logger.info(f"🔚 遇到更早日期话题: {话题日期} < {起始日期}，停止获取")
-                    遇到更早日期 = True
-                    break
-            else:
-                # 今日话题：只要今日的
-                if 话题日期 == 目标日期:
-                    符合条件话题.append(话题)
-                elif 话题日期 < 目标日期:
-                    # 遇到昨天或更早的话题，停止
-                    logger.info(f"🔚 遇到昨天或更早话题: {话题日期} < {目标日期}，停止获取")
-                    遇到更早日期 = True
-                    break
-                else:
-                    # 未来日期，跳过但继续
-                    logger.debug(f"跳过未来日期话题: {话题日期} > {目标日期}")
+        if 起始日期:
+            # 指定日期范围：只要是指定日期或之后的都要
+            开始位置 = 0
+        else:
+            # 今日话题：只要今日的，跳过开头的未来日期话题
+            开始位置 = _统计不早于(日期列表, 目标日期, 包含相等=False)
+            if 开始位置:
+                logger.debug(f"跳过 {开始位置} 个未来日期话题: {日期列表[0]} > {目标日期}")
+        符合条件话题 = 原始话题列表[开始位置:结束位置]
+        
+        if 遇到更早日期:
+            logger.info(f"🔚 遇到更早日期话题: {日期列表[结束位置]} < {截止日期}，停止获取")
         
         logger.info(f"✅ 第{页码}页：从原始{原始数量}个话题中过滤出 【{len(符合条件话题)}个】 符合条件的话题")
         
@@ -263,16 +433,8 @@ def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
             
         # 获取下一页的结束时间，使用原始话题列表的最后一个话题时间
         if 原始话题列表:
-            最后话题时间 = 原始话题列表[-1]["create_time"]
             # 将时间戳减去1毫秒避免重复
-            try:
-                from datetime import datetime
-                dt = datetime.fromisoformat(最后话题时间.replace('+0800', '+08:00'))
-                dt = dt.replace(microsecond=dt.microsecond - 1000 if dt.microsecond >= 1000 else 999000)
-                结束时间 = dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+0800'
-            except:
-                # 如果时间解析失败，直接使用原时间
-                结束时间 = 最后话题时间
+            结束时间 = _前一毫秒(原始话题列表[-1]["create_time"])
         else:
             结束时间 = ""
             
@@ -283,16 +445,20 @@ def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
         if 页码 > MAX_TOPIC_PAGES:
             logger.warning(f"⚠️  已获取{页码 - 1}页话题，达到最大页数限制({MAX_TOPIC_PAGES})，停止获取")
             break
-            
-        time.sleep(1)  # 对API友好
 
-    # 显著的分页总结日志
-    logger.info("=" * 60)
-    logger.info(f"📊 话题获取完成！总共获取了 【{len(所有话题)}个】 符合条件的话题")
-    logger.info(f"📋 共搜索了 【{页码 - 1}页】")
-    logger.info("=" * 60)
-    
-    return 所有话题
+    return 所有话题, 页码
+
+def 获取所有今日话题(起始日期: str = "") -> List[Dict[str, Any]]:
+    """
+    获取所有今日话题（或指定日期范围的话题），获取所有今日话题_async 的同步封装
+
+    参数:
+        起始日期 (str): 过滤的开始日期 (YYYY-MM-DD格式)，为空则只获取今日话题
+
+    返回:
+        List[Dict[str, Any]]: 所有获取的话题列表
+    """
+    return asyncio.run(获取所有今日话题_async(起始日期))
 
 # 保留原函数作为兼容性接口
 def 获取所有话题(最大页数: int, 仅今日: bool = True, 起始日期: str = "") -> List[Dict[str, Any]]:
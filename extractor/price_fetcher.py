@@ -7,9 +7,13 @@ This module fetches stock prices from different sources.
 
 curl_cffi can impersonate browser TLS fingerprints to avoid detection.
 """
+import asyncio
+import functools
 import re
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple, Union
 
 # 使用curl_cffi替代requests以避免TLS指纹检测
 try:
@@ -21,14 +25,60 @@ except ImportError:
     cffi_requests = None
     TLS_IMPERSONATION_AVAILABLE = False
 
-import yfinance as yf
-
 from config import USE_YFINANCE, FINANCE
-from utils import get_logger
+from utils import get_logger, json_loads
 
 # 设置日志器
 logger = get_logger(__name__)
 
+# 股票代码格式（模块加载时预编译）
+_RE_ASHARE = re.compile(r'^\d{6}$')
+_RE_HK = re.compile(r'^\d{4,5}\.HK$', re.IGNORECASE)
+_RE_US = re.compile(r'^[A-Z]{1,5}$', re.IGNORECASE)
+
+# 行情响应解析：直接在原始GBK字节上一次匹配取出当前价字段，无需解码整个响应
+# 新浪A股: "名称,今开,昨收,当前价,..."；新浪港股: "英文名,中文名,今开,昨收,最高,最低,当前价,..."
+# （GBK双字节的尾字节不会是 , 或 "，按分隔符计数是安全的）
+_SINA_A_RE = re.compile(rb'"(?:[^,"]*,){3}([\d.]+),')
+_SINA_HK_RE = re.compile(rb'"(?:[^,"]*,){6}([\d.]+),')
+# 腾讯: "市场~名称~代码~当前价~..."
+# GBK尾字节可能恰好是 ~，因此不按字段计数，而是先定位 "~代码" 再匹配其后的当前价
+_TENCENT_RE = re.compile(rb'[^~]*~([\d.]+)~')
+
+# 各数据源共用的请求头
+_PRICE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# 各数据源的行情接口地址
+_SINA_URL = "http://hq.sinajs.cn/list={}"
+_163_URL = "http://api.money.126.net/data/feed/{}"
+_TENCENT_URL = "http://qt.gtimg.cn/q={}"
+
+# 数据源之间的退避间隔（秒），仅在上一个数据源实际发出请求且失败时生效
+_SOURCE_RETRY_DELAY = 0.5
+
+# 所有数据源都失败的标的在此时间（秒）内直接跳过，避免同一次运行中反复走完整回退链
+_NEGATIVE_CACHE_TTL = 3600
+
+# 成功获取的价格在此时间（秒）内直接复用，同一标的出现在多个话题中时不重复请求
+_PRICE_CACHE_TTL = 300
+
+# 批量获取时的默认并发数，以及yfinance（阻塞调用）所用的线程数
+BATCH_CONCURRENCY = 16
+YFINANCE_MAX_WORKERS = 8
+
+@functools.lru_cache(maxsize=1)
+def _load_yfinance():
+    """
+    延迟导入yfinance（连带导入pandas等，耗时较长），仅在首次需要时加载
+    
+    Returns:
+        module: yfinance 模块
+    """
+    import yfinance
+    return yfinance
+
 def create_session():
     """
     创建带有TLS指纹伪装的会话对象
@@ -53,6 +103,103 @@ def create_session():
         logger.warning("curl_cffi不可用，使用普通requests.Session")
         return std_requests.Session()
 
+# 每个线程复用一个会话，使keep-alive和连接池在多次请求间摊销TLS握手；
+# 会话随线程存活，进程内不主动关闭
+_thread_local = threading.local()
+
+def _get_shared_session():
+    """
+    获取当前线程复用的TLS伪装会话（首次调用时创建）
+    
+    Returns:
+        Session: 当前线程的会话对象，FINANCE=False时为 None
+    """
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = create_session()
+        _thread_local.session = session
+    return session
+
+def _classify_ticker(ticker: str) -> Literal["A", "HK", "US", "?"]:
+    """
+    判断股票代码所属市场，只执行一次格式匹配
+    
+    Args:
+        ticker (str): 股票代码
+        
+    Returns:
+        str: "A"（A股）、"HK"（港股）、"US"（美股）或 "?"（无法识别）
+    """
+    if _RE_ASHARE.match(ticker):
+        return "A"
+    if _RE_HK.match(ticker):
+        return "HK"
+    if _RE_US.match(ticker):
+        return "US"
+    return "?"
+
+class _TickerSymbols(NamedTuple):
+    """各数据源所需的代码格式，不支持的数据源对应 "" """
+    kind: str
+    yfinance: str
+    sina: str
+    netease: str
+    tencent: str
+    tencent_code: str  # 腾讯响应中的代码字段（用于定位当前价）
+    currency: str
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_ticker(ticker: str) -> _TickerSymbols:
+    """
+    一次性计算股票代码在各数据源下的格式（纯函数，结果按代码缓存）
+    
+    各数据源的代码转换函数都从这里取值，市场判断、补零和大写转换每个代码只做一次。
+    
+    Args:
+        ticker (str): 股票代码
+        
+    Returns:
+        _TickerSymbols: 各数据源的代码格式
+    """
+    kind = _classify_ticker(ticker)
+    if kind == "A":
+        # A股：6开头是上海，0/3开头是深圳
+        shanghai = ticker.startswith('6')
+        exchange = "sh" if shanghai else "sz"
+        return _TickerSymbols(
+            kind=kind,
+            yfinance=f"{ticker}.SS" if shanghai else f"{ticker}.SZ",
+            sina=f"{exchange}{ticker}",
+            netease=f"0{ticker}" if shanghai else f"1{ticker}",
+            tencent=f"{exchange}{ticker}",
+            tencent_code=ticker,
+            currency="¥",  # 人民币
+        )
+    if kind == "HK":
+        # 港股：去掉.HK后缀并补齐到5位
+        hk_code = ticker.split('.')[0].zfill(5)
+        return _TickerSymbols(
+            kind=kind,
+            yfinance=ticker.upper(),
+            sina=f"rt_hk{hk_code}",
+            netease="",  # 网易财经仅支持A股
+            tencent=f"hk{hk_code}",
+            tencent_code=hk_code,
+            currency="HK$",  # 港币
+        )
+    if kind == "US":
+        us_code = ticker.upper()
+        return _TickerSymbols(
+            kind=kind,
+            yfinance=us_code,
+            sina="",
+            netease="",
+            tencent=us_code,
+            tencent_code=us_code,
+            currency="$",  # 美元
+        )
+    return _TickerSymbols(kind=kind, yfinance="", sina="", netease="", tencent="", tencent_code="", currency="")
+
 def get_currency_symbol(ticker: str) -> str:
     """
     根据股票代码获取对应的货币符号
@@ -61,24 +208,13 @@ def get_currency_symbol(ticker: str) -> str:
         ticker (str): 股票代码
         
     Returns:
-        str: 货币符号
+        str: 货币符号，无法识别的代码返回 ""
     """
     # 当前无价逻辑：FINANCE=False时不需要货币符号
     if not FINANCE:
         return ""
         
-    if re.match(r'^\d{6}$', ticker):
-        # A股 - 人民币
-        return "¥"
-    elif re.match(r'^\d{4,5}\.HK$', ticker, re.IGNORECASE):
-        # 港股 - 港币  
-        return "HK$"
-    elif re.match(r'^[A-Z]{1,5}$', ticker, re.IGNORECASE):
-        # 美股 - 美元
-        return "$"
-    else:
-        # 默认无货币符号
-        return ""
+    return _normalize_ticker(ticker).currency
 
 def format_price_with_currency(price: float, ticker: str) -> str:
     """
@@ -113,46 +249,155 @@ def get_price_from_yfinance(ticker: str) -> str:
         return ""
         
     try:
-        # 创建带有TLS指纹伪装的会话
-        session = create_session()
+        # 复用带有TLS指纹伪装的会话
+        session = _get_shared_session()
         if not session:
             logger.debug("价格获取功能已禁用 (FINANCE=False)，跳过yfinance。")
             return ""
+        yf = _load_yfinance()
         
         # Normalize ticker for yfinance
-        if re.match(r'^\d{6}$', ticker):
+        kind = _normalize_ticker(ticker).kind
+        if kind == "A":
             # A-shares, try both Shanghai (.SS) and Shenzhen (.SZ)
             stock = yf.Ticker(f"{ticker}.SS", session=session)
             history = stock.history(period="2d")
             if history.empty:
                 stock = yf.Ticker(f"{ticker}.SZ", session=session)
                 history = stock.history(period="2d")
-        elif re.match(r'^\d{4,5}\.HK$', ticker, re.IGNORECASE):
+        elif kind == "HK":
             stock = yf.Ticker(ticker, session=session)
             history = stock.history(period="2d")
-        elif re.match(r'^[A-Z]{1,5}$', ticker, re.IGNORECASE):
+        elif kind == "US":
             stock = yf.Ticker(ticker, session=session)
             history = stock.history(period="2d")
         else:
             logger.warning(f"Invalid ticker format for yfinance: {ticker}")
             return ""
 
-        if history.empty or len(history) < 2:
+        # 只取最新收盘价，与 get_prices_yfinance_batch 一致：有一行有效收盘价即可
+        closes = history['Close'].dropna() if not history.empty else history
+        if closes.empty:
             logger.warning(f"No data found for ticker: {ticker} on yfinance")
             return ""
 
-        # Get the last two days for price change calculation
-        last_close = history['Close'].iloc[-1]
-        prev_close = history['Close'].iloc[-2]
+        return format_price_with_currency(float(closes.iloc[-1]), ticker)
+
+    except Exception as e:
+        logger.error(f"Failed to fetch price for {ticker} from yfinance: {e}")
+        return ""
 
-        price_change_pct = ((last_close - prev_close) / prev_close) * 100
-        sign = "+" if price_change_pct >= 0 else ""
+def _to_yfinance_symbol(ticker: str) -> str:
+    """
+    将股票代码转换为yfinance代码（A股按代码前缀确定交易所）
+    
+    Args:
+        ticker (str): 股票代码
         
-        return format_price_with_currency(last_close, ticker)
+    Returns:
+        str: yfinance代码，不支持的格式返回 ""
+    """
+    return _normalize_ticker(ticker).yfinance
 
+def get_prices_yfinance_batch(tickers: List[str]) -> Dict[str, str]:
+    """
+    通过一次 yf.download 请求批量获取多个标的的价格
+    
+    Args:
+        tickers (List[str]): 股票代码列表
+        
+    Returns:
+        Dict[str, str]: {股票代码: 格式化价格}，只包含成功获取的标的
+    """
+    # 当前无价逻辑：FINANCE=False时直接返回空结果
+    if not FINANCE:
+        return {}
+        
+    symbol_to_ticker = {}
+    for ticker in tickers:
+        symbol = _to_yfinance_symbol(ticker) if ticker else ""
+        if symbol:
+            symbol_to_ticker.setdefault(symbol, ticker)
+    if not symbol_to_ticker:
+        return {}
+        
+    try:
+        session = _get_shared_session()
+        if not session:
+            logger.debug("价格获取功能已禁用 (FINANCE=False)，跳过yfinance批量请求。")
+            return {}
+            
+        symbols = list(symbol_to_ticker)
+        yf = _load_yfinance()
+        data = yf.download(
+            symbols, period="2d", group_by='ticker', threads=True,
+            auto_adjust=True, session=session, progress=False
+        )
+        if data is None or data.empty:
+            logger.warning(f"yfinance批量请求未返回数据: {symbols}")
+            return {}
+            
+        prices = {}
+        multi_level = data.columns.nlevels > 1
+        for symbol, ticker in symbol_to_ticker.items():
+            if multi_level:
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                closes = data[symbol]['Close'].dropna()
+            else:
+                closes = data['Close'].dropna()
+            if not closes.empty:
+                prices[ticker] = format_price_with_currency(float(closes.iloc[-1]), ticker)
+        
+        logger.info(f"yfinance批量请求获取到 {len(prices)}/{len(symbol_to_ticker)} 个标的的价格")
+        return prices
+        
     except Exception as e:
-        logger.error(f"Failed to fetch price for {ticker} from yfinance: {e}")
+        logger.error(f"yfinance批量请求失败: {e}")
+        return {}
+
+def _build_sina_symbol(ticker: str) -> str:
+    """
+    将股票代码转换为新浪财经API所需的格式
+    
+    Args:
+        ticker (str): 股票代码
+        
+    Returns:
+        str: 新浪格式的代码，不支持的格式返回 ""
+    """
+    return _normalize_ticker(ticker).sina
+
+def _parse_sina_content(content: bytes, ticker: str) -> str:
+    """
+    解析新浪财经API的返回内容
+    
+    Args:
+        content (bytes): 原始响应内容（GBK编码，无需解码）
+        ticker (str): 股票代码
+        
+    Returns:
+        str: 格式化的价格字符串，解析失败返回 ""
+    """
+    if not content or b'var hq_str_' not in content:
+        logger.warning(f"No valid data from Sina API for {ticker}")
+        return ""
+        
+    # A股和港股的数据格式略有不同
+    kind = _normalize_ticker(ticker).kind
+    if kind == "A":
+        match = _SINA_A_RE.search(content)
+    elif kind == "HK":
+        match = _SINA_HK_RE.search(content)
+    else:
+        return ""
+        
+    if not match:
+        logger.warning(f"Insufficient data fields from Sina API for {ticker}")
         return ""
+        
+    current_price = float(match.group(1))  # 当前价
+    return format_price_with_currency(current_price, ticker)
 
 def get_price_from_sina(ticker: str) -> str:
     """
@@ -170,76 +415,71 @@ def get_price_from_sina(ticker: str) -> str:
         
     try:
         # 标准化ticker格式
-        sina_ticker = ""
-        if re.match(r'^\d{6}$', ticker):
-            # A股：6开头是上海，0/3开头是深圳
-            if ticker.startswith('6'):
-                sina_ticker = f"sh{ticker}"
-            else:
-                sina_ticker = f"sz{ticker}"
-        elif re.match(r'^\d{4,5}\.HK$', ticker, re.IGNORECASE):
-            # 港股：去掉.HK后缀，加rt_hk前缀
-            hk_code = ticker.split('.')[0].zfill(5)  # 补齐到5位
-            sina_ticker = f"rt_hk{hk_code}"
-        else:
+        sina_ticker = _build_sina_symbol(ticker)
+        if not sina_ticker:
             logger.warning(f"Unsupported ticker format for Sina API: {ticker}")
             return ""
 
         # 请求新浪财经API
-        url = f"http://hq.sinajs.cn/list={sina_ticker}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        url = _SINA_URL.format(sina_ticker)
         
-        session = create_session()
+        session = _get_shared_session()
         if not session:
             logger.debug("价格获取功能已禁用 (FINANCE=False)，跳过Sina API。")
             return ""
-        response = session.get(url, headers=headers, timeout=5)
-        response.encoding = 'gbk'  # 新浪API使用GBK编码
+        response = session.get(url, headers=_PRICE_HEADERS, timeout=5)
         
         if response.status_code != 200:
             logger.error(f"Sina API request failed with status {response.status_code}")
             return ""
             
-        # 解析返回数据
-        content = response.text.strip()
-        if not content or 'var hq_str_' not in content:
-            logger.warning(f"No valid data from Sina API for {ticker}")
-            return ""
-            
-        # 提取数据部分
-        data_part = content.split('"')[1]
-        data_fields = data_part.split(',')
-        
-        if len(data_fields) < 4:
-            logger.warning(f"Insufficient data fields from Sina API for {ticker}")
-            return ""
-            
-        # A股和港股的数据格式略有不同
-        if sina_ticker.startswith(('sh', 'sz')):
-            # A股格式
-            current_price = float(data_fields[3])  # 当前价
-            prev_close = float(data_fields[2])     # 昨收价
-        elif sina_ticker.startswith('rt_hk'):
-            # 港股格式  
-            current_price = float(data_fields[6])  # 当前价
-            prev_close = float(data_fields[3])     # 昨收价
-        else:
-            return ""
-            
-        # 计算涨跌幅
-        if prev_close > 0:
-            price_change_pct = ((current_price - prev_close) / prev_close) * 100
-            sign = "+" if price_change_pct >= 0 else ""
-            return format_price_with_currency(current_price, ticker)
-        else:
-            return format_price_with_currency(current_price, ticker)
+        # 新浪API使用GBK编码，价格字段为ASCII，直接解析原始字节
+        return _parse_sina_content(response.content.strip(), ticker)
             
     except Exception as e:
         logger.error(f"Failed to fetch price for {ticker} from Sina API: {e}")
         return ""
 
+def _build_163_symbol(ticker: str) -> str:
+    """
+    将股票代码转换为网易财经API所需的格式（仅支持A股）
+    
+    Args:
+        ticker (str): 股票代码
+        
+    Returns:
+        str: 网易格式的代码，不支持的格式返回 ""
+    """
+    return _normalize_ticker(ticker).netease
+
+def _parse_163_content(content: str, ticker: str) -> str:
+    """
+    解析网易财经API的JSONP返回内容
+    
+    Args:
+        content (str): 已解码的响应文本
+        ticker (str): 股票代码
+        
+    Returns:
+        str: 格式化的价格字符串，解析失败返回 ""
+    """
+    if not content or not content.startswith('_ntes_quote_callback('):
+        logger.warning(f"No valid data from 163 API for {ticker}")
+        return ""
+        
+    # 提取JSON部分
+    json_start = content.find('{')
+    json_end = content.rfind('}') + 1
+    data = json_loads(content[json_start:json_end])
+    
+    stock_data = data.get(_build_163_symbol(ticker), {})
+    if not stock_data:
+        logger.warning(f"No stock data for {ticker} in 163 API response")
+        return ""
+        
+    current_price = float(stock_data.get('price', 0))
+    return format_price_with_currency(current_price, ticker)
+
 def get_price_from_163(ticker: str) -> str:
     """
     从网易财经获取股价信息（第二备用数据源）
@@ -256,60 +496,68 @@ def get_price_from_163(ticker: str) -> str:
         
     try:
         # 标准化ticker格式
-        if re.match(r'^\d{6}$', ticker):
-            # A股
-            if ticker.startswith('6'):
-                api_ticker = f"0{ticker}"  # 上海
-            else:
-                api_ticker = f"1{ticker}"  # 深圳
-        else:
+        api_ticker = _build_163_symbol(ticker)
+        if not api_ticker:
             logger.warning(f"Unsupported ticker format for 163 API: {ticker}")
             return ""
 
         # 请求网易财经API
-        url = f"http://api.money.126.net/data/feed/{api_ticker}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        url = _163_URL.format(api_ticker)
         
-        session = create_session()
+        session = _get_shared_session()
         if not session:
             logger.debug("价格获取功能已禁用 (FINANCE=False)，跳过163 API。")
             return ""
-        response = session.get(url, headers=headers, timeout=5)
+        response = session.get(url, headers=_PRICE_HEADERS, timeout=5)
         
         if response.status_code != 200:
             logger.error(f"163 API request failed with status {response.status_code}")
             return ""
             
-        # 解析JSON数据
-        content = response.text.strip()
-        if not content or not content.startswith('_ntes_quote_callback('):
-            logger.warning(f"No valid data from 163 API for {ticker}")
-            return ""
+        return _parse_163_content(response.text.strip(), ticker)
             
-        # 提取JSON部分
-        json_start = content.find('{')
-        json_end = content.rfind('}') + 1
-        json_str = content[json_start:json_end]
+    except Exception as e:
+        logger.error(f"Failed to fetch price for {ticker} from 163 API: {e}")
+        return ""
+
+def _build_tencent_symbol(ticker: str) -> str:
+    """
+    将股票代码转换为腾讯股票API所需的格式
+    
+    Args:
+        ticker (str): 股票代码
         
-        import json
-        data = json.loads(json_str)
+    Returns:
+        str: 腾讯格式的代码，不支持的格式返回 ""
+    """
+    return _normalize_ticker(ticker).tencent
+
+def _parse_tencent_content(content: bytes, ticker: str) -> str:
+    """
+    解析腾讯股票API的返回内容
+    
+    Args:
+        content (bytes): 原始响应内容（GBK编码，无需解码）
+        ticker (str): 股票代码
         
-        stock_data = data.get(api_ticker, {})
-        if not stock_data:
-            logger.warning(f"No stock data for {ticker} in 163 API response")
-            return ""
-            
-        current_price = float(stock_data.get('price', 0))
-        percent = float(stock_data.get('percent', 0))
+    Returns:
+        str: 格式化的价格字符串，解析失败返回 ""
+    """
+    if not content or b'~' not in content:
+        logger.warning(f"No valid data from Tencent API for {ticker}")
+        return ""
         
-        sign = "+" if percent >= 0 else ""
-        return format_price_with_currency(current_price, ticker)
-            
-    except Exception as e:
-        logger.error(f"Failed to fetch price for {ticker} from 163 API: {e}")
+    # 腾讯API返回格式：v_xxx="市场~股票名~代码~当前价~..."，取代码后的当前价字段
+    # 代码字段：A股/港股为去掉 sh/sz/hk 前缀的数字，美股以ticker开头（如 AAPL.OQ）
+    code = _normalize_ticker(ticker).tencent_code
+    code_pos = content.find(b'~' + code.encode('ascii')) if code else -1
+    match = _TENCENT_RE.match(content, code_pos + 1) if code_pos >= 0 else None
+    if not match:
+        logger.warning(f"Insufficient data fields from Tencent API for {ticker}")
         return ""
+        
+    current_price = float(match.group(1))
+    return format_price_with_currency(current_price, ticker)
 
 def get_price_from_tencent(ticker: str) -> str:
     """
@@ -327,104 +575,151 @@ def get_price_from_tencent(ticker: str) -> str:
         
     try:
         # 标准化ticker格式
-        tencent_ticker = ""
-        if re.match(r'^\d{6}$', ticker):
-            # A股：6开头是上海，0/3开头是深圳
-            if ticker.startswith('6'):
-                tencent_ticker = f"sh{ticker}"
-            else:
-                tencent_ticker = f"sz{ticker}"
-        elif re.match(r'^\d{4,5}\.HK$', ticker, re.IGNORECASE):
-            # 港股：去掉.HK后缀，加hk前缀
-            hk_code = ticker.split('.')[0].zfill(5)  # 补齐到5位
-            tencent_ticker = f"hk{hk_code}"
-        elif re.match(r'^[A-Z]{1,5}$', ticker, re.IGNORECASE):
-            # 美股：不需要前缀，直接使用ticker
-            tencent_ticker = f"{ticker.upper()}"
-        else:
+        tencent_ticker = _build_tencent_symbol(ticker)
+        if not tencent_ticker:
             logger.warning(f"Unsupported ticker format for Tencent API: {ticker}")
             return ""
 
         # 请求腾讯股票API
-        url = f"http://qt.gtimg.cn/q={tencent_ticker}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        url = _TENCENT_URL.format(tencent_ticker)
         
-        session = create_session()
+        session = _get_shared_session()
         if not session:
             logger.debug("价格获取功能已禁用 (FINANCE=False)，跳过Tencent API。")
             return ""
-        response = session.get(url, headers=headers, timeout=5)
-        response.encoding = 'gbk'  # 腾讯API使用GBK编码
+        response = session.get(url, headers=_PRICE_HEADERS, timeout=5)
         
         if response.status_code != 200:
             logger.error(f"Tencent API request failed with status {response.status_code}")
             return ""
             
-        # 解析返回数据
-        content = response.text.strip()
-        if not content or '~' not in content:
-            logger.warning(f"No valid data from Tencent API for {ticker}")
-            return ""
-            
-        # 提取数据部分（腾讯API返回格式：v_xxx="股票名~当前价~..."）
-        data_part = content.split('"')[1]
-        data_fields = data_part.split('~')
-        
-        if len(data_fields) < 4:
-            logger.warning(f"Insufficient data fields from Tencent API for {ticker}")
-            return ""
-            
-        # 获取当前价格（第3个字段）
-        current_price = float(data_fields[3])
-        return format_price_with_currency(current_price, ticker)
+        # 腾讯API使用GBK编码，价格字段为ASCII，直接解析原始字节
+        return _parse_tencent_content(response.content.strip(), ticker)
             
     except Exception as e:
         logger.error(f"Failed to fetch price for {ticker} from Tencent API: {e}")
         return ""
 
-def get_price_with_fallback(ticker: str) -> str:
+# 全部数据源失败的标的 -> 失败时间戳
+_negative_cache: Dict[str, float] = {}
+
+def _is_known_failure(ticker: str) -> bool:
     """
-    使用多个数据源获取股价，按优先级依次尝试
+    判断标的是否在近期已被所有数据源判定为无法获取价格
+    
+    Args:
+        ticker (str): 股票代码
+        
+    Returns:
+        bool: 在负缓存有效期内返回 True
+    """
+    failed_at = _negative_cache.get(ticker)
+    return failed_at is not None and time.time() - failed_at < _NEGATIVE_CACHE_TTL
+
+def _mark_failure(ticker: str):
+    """
+    记录标的在所有数据源均获取失败
+    
+    Args:
+        ticker (str): 股票代码
+    """
+    _negative_cache[ticker] = time.time()
+
+# 成功获取价格的标的 -> (获取时间戳, 格式化价格)
+_price_cache: Dict[str, Tuple[float, str]] = {}
+
+def _get_cached_price(ticker: str) -> Optional[str]:
+    """
+    读取有效期内已获取的价格
     
     Args:
         ticker (str): 股票代码
         
     Returns:
-        str: 格式化的价格字符串 "价格" 或 "" 如果全部失败
+        Optional[str]: 缓存的格式化价格，未缓存或已过期时返回 None
     """
+    cached = _price_cache.get(ticker)
+    if cached is None or time.time() - cached[0] >= _PRICE_CACHE_TTL:
+        return None
+    return cached[1]
+
+def _cache_price(ticker: str, price: str):
+    """
+    记录成功获取的价格（空价格不缓存）
+    
+    Args:
+        ticker (str): 股票代码
+        price (str): 格式化价格
+    """
+    if price:
+        _price_cache[ticker] = (time.time(), price)
+
+def get_price_with_fallback(ticker: Union[str, List[str]], skip_yfinance: bool = False) -> Union[str, Dict[str, str]]:
+    """
+    使用多个数据源获取股价，按优先级依次尝试
+    
+    Args:
+        ticker (Union[str, List[str]]): 股票代码，传入列表时走批量获取
+        skip_yfinance (bool): 跳过yfinance，用于yfinance批量请求已确认缺失的标的
+        
+    Returns:
+        Union[str, Dict[str, str]]: 格式化的价格字符串 "价格" 或 "" 如果全部失败；
+            传入列表时返回 {股票代码: 格式化价格}
+    """
+    if isinstance(ticker, list):
+        return get_prices(ticker)
+        
     # 当前无价逻辑：FINANCE=False时直接返回空字符串
     if not FINANCE:
         return ""
         
     if not ticker:
         return ""
+        
+    if _is_known_failure(ticker):
+        logger.debug(f"{ticker} 近期所有数据源均获取失败，跳过")
+        return ""
+        
+    cached_price = _get_cached_price(ticker)
+    if cached_price is not None:
+        return cached_price
     
-    # 数据源优先级：yfinance -> 腾讯股票 -> 新浪财经 -> 网易财经  
+    # 数据源优先级：yfinance -> 腾讯股票 -> 新浪财经 -> 网易财经
+    # 代码转换函数用于预先判断数据源是否支持该代码格式，不支持时不发请求
     data_sources = [
-        ("yfinance", get_price_from_yfinance),
-        ("tencent", get_price_from_tencent),
-        ("sina", get_price_from_sina),
-        ("163", get_price_from_163)
+        ("yfinance", _to_yfinance_symbol, get_price_from_yfinance),
+        ("tencent", _build_tencent_symbol, get_price_from_tencent),
+        ("sina", _build_sina_symbol, get_price_from_sina),
+        ("163", _build_163_symbol, get_price_from_163)
     ]
+    if skip_yfinance:
+        data_sources = data_sources[1:]
     
-    for source_name, fetch_func in data_sources:
+    requested = False
+    for source_name, build_symbol, fetch_func in data_sources:
+        if not build_symbol(ticker):
+            logger.debug(f"{source_name}不支持{ticker}的代码格式，跳过")
+            continue
+            
+        # 上一个数据源发出过请求且失败，短暂延迟后再请求下一个，避免请求过于频繁
+        if requested:
+            time.sleep(_SOURCE_RETRY_DELAY)
+        requested = True
+        
         try:
             logger.info(f"尝试从{source_name}获取{ticker}的价格...")
             price = fetch_func(ticker)
             if price:
                 logger.info(f"成功从{source_name}获取到价格: {price}")
+                _cache_price(ticker, price)
                 return price
             else:
                 logger.warning(f"{source_name}未返回有效价格数据")
         except Exception as e:
             logger.error(f"从{source_name}获取价格时出错: {e}")
-            
-        # 在不同数据源之间添加短暂延迟，避免请求过于频繁
-        time.sleep(0.5)
     
     logger.error(f"所有数据源都无法获取{ticker}的价格")
+    _mark_failure(ticker)
     return ""
 
 def get_price(ticker: str) -> str:
@@ -452,3 +747,216 @@ def get_price(ticker: str) -> str:
     else:
         logger.warning("Alternative price source not implemented")
         return ""
+
+# ==================== 异步批量获取 ====================
+
+# 异步数据源：(名称, 代码转换函数, URL模板, 是否解码为文本, 解析函数)，顺序即优先级
+_ASYNC_SOURCES = [
+    ("tencent", _build_tencent_symbol, _TENCENT_URL, False, _parse_tencent_content),
+    ("sina", _build_sina_symbol, _SINA_URL, False, _parse_sina_content),
+    ("163", _build_163_symbol, _163_URL, True, _parse_163_content),
+]
+
+def _create_async_session():
+    """
+    创建带有TLS指纹伪装的异步会话对象
+    
+    必须在事件循环中调用；同一批次内的所有请求共用该会话以复用连接。
+    
+    Returns:
+        AsyncSession: curl_cffi异步会话，curl_cffi不可用时返回 None
+    """
+    if TLS_IMPERSONATION_AVAILABLE and cffi_requests:
+        try:
+            return cffi_requests.AsyncSession(impersonate="chrome", max_clients=BATCH_CONCURRENCY)
+        except Exception as e:
+            logger.warning(f"创建异步TLS伪装会话失败，回退到线程池同步获取: {e}")
+    return None
+
+async def _get_price_from_source_async(session, source: tuple, ticker: str) -> str:
+    """
+    从单个HTTP数据源异步获取股价
+    
+    Args:
+        session: curl_cffi异步会话
+        source (tuple): _ASYNC_SOURCES 中的数据源配置
+        ticker (str): 股票代码
+        
+    Returns:
+        str: 格式化的价格字符串，失败返回 ""
+    """
+    source_name, build_symbol, url_template, as_text, parse_content = source
+    symbol = build_symbol(ticker)
+    if not symbol:
+        logger.warning(f"Unsupported ticker format for {source_name} API: {ticker}")
+        return ""
+        
+    try:
+        response = await session.get(url_template.format(symbol), headers=_PRICE_HEADERS, timeout=5)
+            
+        if response.status_code != 200:
+            logger.error(f"{source_name} API request failed with status {response.status_code}")
+            return ""
+            
+        body = response.text if as_text else response.content
+        return parse_content(body.strip(), ticker)
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch price for {ticker} from {source_name} API: {e}")
+        return ""
+
+async def get_price_async(ticker: str, session=None, executor: Optional[ThreadPoolExecutor] = None,
+                          skip_yfinance: bool = False) -> str:
+    """
+    get_price_with_fallback 的异步版本，数据源优先级相同
+    
+    yfinance为阻塞调用，放入线程池执行；其余HTTP数据源通过异步会话请求，
+    数据源之间的退避使用 asyncio.sleep，不会阻塞同一批次中的其他标的。
+    
+    Args:
+        ticker (str): 股票代码
+        session: 复用的异步会话，为空时自动创建
+        executor (Optional[ThreadPoolExecutor]): 执行阻塞调用的线程池，为空时使用默认线程池
+        skip_yfinance (bool): 跳过yfinance，直接从HTTP数据源开始
+        
+    Returns:
+        str: 格式化的价格字符串 或 "" 如果全部失败
+    """
+    # 当前无价逻辑：FINANCE=False时直接返回空字符串
+    if not FINANCE:
+        return ""
+        
+    if not ticker:
+        return ""
+        
+    if _is_known_failure(ticker):
+        logger.debug(f"{ticker} 近期所有数据源均获取失败，跳过")
+        return ""
+        
+    cached_price = _get_cached_price(ticker)
+    if cached_price is not None:
+        return cached_price
+        
+    loop = asyncio.get_running_loop()
+    
+    if session is None:
+        session = _create_async_session()
+        if session is None:
+            # curl_cffi不可用：整条回退链放入线程池同步执行
+            return await loop.run_in_executor(executor, get_price_with_fallback, ticker, skip_yfinance)
+        try:
+            return await get_price_async(ticker, session, executor, skip_yfinance)
+        finally:
+            await session.close()
+    
+    sources = [(source[0], source) for source in _ASYNC_SOURCES]
+    if not skip_yfinance:
+        sources.insert(0, ("yfinance", None))
+    requested = False
+    for source_name, source in sources:
+        build_symbol = _to_yfinance_symbol if source is None else source[1]
+        if not build_symbol(ticker):
+            logger.debug(f"{source_name}不支持{ticker}的代码格式，跳过")
+            continue
+            
+        if requested:
+            # 上一个数据源发出过请求且失败，短暂退避后再尝试下一个
+            await asyncio.sleep(_SOURCE_RETRY_DELAY)
+        requested = True
+            
+        logger.info(f"尝试从{source_name}获取{ticker}的价格...")
+        if source is None:
+            price = await loop.run_in_executor(executor, get_price_from_yfinance, ticker)
+        else:
+            price = await _get_price_from_source_async(session, source, ticker)
+            
+        if price:
+            logger.info(f"成功从{source_name}获取到价格: {price}")
+            _cache_price(ticker, price)
+            return price
+        logger.warning(f"{source_name}未返回有效价格数据")
+    
+    logger.error(f"所有数据源都无法获取{ticker}的价格")
+    _mark_failure(ticker)
+    return ""
+
+async def get_prices_batch(tickers: List[str], concurrency: int = BATCH_CONCURRENCY) -> Dict[str, str]:
+    """
+    并发获取多个标的的价格，使用信号量限制同时进行的请求数
+    
+    Args:
+        tickers (List[str]): 股票代码列表，重复和空代码会被忽略
+        concurrency (int): 最大并发数
+        
+    Returns:
+        Dict[str, str]: {股票代码: 格式化价格}，获取失败的代码对应 ""
+    """
+    # 当前无价逻辑：FINANCE=False时直接返回空结果
+    if not FINANCE:
+        return {}
+        
+    unique_tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+    if not unique_tickers:
+        return {}
+        
+    if not USE_YFINANCE:
+        logger.warning("Alternative price source not implemented")
+        return {ticker: "" for ticker in unique_tickers}
+        
+    logger.info(f"开始并发获取 {len(unique_tickers)} 个标的的价格 (并发数: {concurrency})")
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    with ThreadPoolExecutor(max_workers=YFINANCE_MAX_WORKERS) as executor:
+        # 1. yfinance一次请求覆盖全部标的（近期已获取过价格或已确认无法获取的标的直接跳过）
+        loop = asyncio.get_running_loop()
+        results = {ticker: "" for ticker in unique_tickers}
+        pending_tickers = []
+        for ticker in unique_tickers:
+            cached_price = _get_cached_price(ticker)
+            if cached_price is not None:
+                results[ticker] = cached_price
+            elif not _is_known_failure(ticker):
+                pending_tickers.append(ticker)
+        if pending_tickers:
+            batch_prices = await loop.run_in_executor(executor, get_prices_yfinance_batch, pending_tickers)
+            for ticker, price in batch_prices.items():
+                _cache_price(ticker, price)
+            results.update(batch_prices)
+        missing_tickers = [ticker for ticker in pending_tickers if not results.get(ticker)]
+        if not missing_tickers:
+            return results
+        
+        # 2. 批量结果中缺失的标的逐个走回退链；yfinance刚刚已经查过，直接从腾讯开始
+        session = _create_async_session()
+        
+        async def fetch_one(ticker: str) -> str:
+            async with semaphore:
+                if session is None:
+                    return await loop.run_in_executor(executor, get_price_with_fallback, ticker, True)
+                return await get_price_async(ticker, session, executor, skip_yfinance=True)
+        
+        try:
+            prices = await asyncio.gather(*(fetch_one(ticker) for ticker in missing_tickers))
+        finally:
+            if session is not None:
+                await session.close()
+    
+    results.update(zip(missing_tickers, prices))
+    return results
+
+def get_prices(tickers: List[str], concurrency: int = BATCH_CONCURRENCY) -> Dict[str, str]:
+    """
+    get_prices_batch 的同步封装，供同步调用方（如线程池中的任务）使用
+    
+    注意：内部使用 asyncio.run，不能在已运行的事件循环中调用。
+    
+    Args:
+        tickers (List[str]): 股票代码列表
+        concurrency (int): 最大并发数
+        
+    Returns:
+        Dict[str, str]: {股票代码: 格式化价格}
+    """
+    if not FINANCE or not tickers:
+        return {}
+    return asyncio.run(get_prices_batch(tickers, concurrency))
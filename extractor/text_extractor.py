@@ -2,6 +2,7 @@
 文本提取器模块：从zsxq话题数据中提取结构化信息
 """
 import re
+from itertools import islice
 from typing import Dict, Any, Optional
 
 from utils import get_logger
@@ -9,15 +10,53 @@ from utils import get_logger
 # 设置日志器
 logger = get_logger(__name__)
 
+# 文本清理和统计用的正则（模块加载时预编译）
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_HTML_ENTITY_RE = re.compile(r'&[a-zA-Z]+;')
+_WHITESPACE_RE = re.compile(r'\s+')
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')  # 中文字符（Unicode范围：\u4e00-\u9fff）
+
+# 有效内容至少需要的中文字符数
+MIN_CHINESE_CHARS = 50
+
+def _count_chinese_chars(text: str) -> int:
+    """统计中文字符数（删除中文字符后比较长度，不构建匹配列表）"""
+    return len(text) - len(_CJK_RE.sub('', text))
+
+def _has_chinese_chars(text: str, min_count: int) -> bool:
+    """判断中文字符数是否达到min_count（找到第min_count个中文字符即返回，不扫描全文）"""
+    if min_count <= 0:
+        return True
+    if len(text) < min_count:
+        return False
+    return next(islice(_CJK_RE.finditer(text), min_count - 1, None), None) is not None
+
 class TextExtractor:
     """
     从zsxq话题对象中提取结构化数据的类
     """
 
+    # 每个话题创建一个实例，固定属性槽位可减少实例的内存和创建开销
+    __slots__ = ('topic', 'text', '_summary', '_chinese_char_count')
+
     def __init__(self, topic: Dict[str, Any]):
         self.topic = topic
         self.text = self._get_text()
-        logger.debug(f"初始化TextExtractor，文本长度: {len(self.text)}")
+        # 清理后的文本和其中文字符数在首次使用时计算并缓存，多个方法共享
+        self._summary: Optional[str] = None
+        self._chinese_char_count: Optional[int] = None
+        logger.debug("初始化TextExtractor，文本长度: %d", len(self.text))
+
+    @classmethod
+    def extract(cls, topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        提取单个话题的结构化数据，等价于 TextExtractor(topic).extract_all()
+
+        原文总长度都不到最少中文字符数的话题不可能有效，直接跳过，不创建实例也不做文本清理
+        """
+        if len(topic.get("talk", {}).get("text", "")) < MIN_CHINESE_CHARS:
+            return None
+        return cls(topic).extract_all()
 
     def _get_text(self) -> str:
         """安全地从话题中获取主要文本内容"""
@@ -34,45 +73,52 @@ class TextExtractor:
         """从话题中提取创建日期"""
         return self.topic.get("create_time", "")[:10]
 
+    @property
+    def summary(self) -> str:
+        """清理后的文本内容（首次访问时计算并缓存）"""
+        if self._summary is None:
+            # 清理HTML标签和特殊字符，但保留完整内容
+            clean_text = _HTML_TAG_RE.sub('', self.text)  # 移除HTML标签
+            clean_text = _HTML_ENTITY_RE.sub('', clean_text)  # 移除HTML实体
+            clean_text = _WHITESPACE_RE.sub(' ', clean_text)  # 标准化空白字符
+            self._summary = clean_text.strip()
+        return self._summary
+
+    @property
+    def chinese_char_count(self) -> int:
+        """清理后文本中的中文字符数（首次访问时计算并缓存）"""
+        if self._chinese_char_count is None:
+            self._chinese_char_count = _count_chinese_chars(self.summary)
+        return self._chinese_char_count
+
     def extract_summary(self) -> str:
         """返回完整的清理后文本内容，用于传递给LLM处理"""
-        # 清理HTML标签和特殊字符，但保留完整内容
-        clean_text = re.sub(r'<[^>]+>', '', self.text)  # 移除HTML标签
-        clean_text = re.sub(r'&[a-zA-Z]+;', '', clean_text)  # 移除HTML实体
-        clean_text = re.sub(r'\s+', ' ', clean_text)  # 标准化空白字符
-        return clean_text.strip()
+        return self.summary
 
-    def is_content_valid(self, min_length: int = 50) -> bool:
+    def is_content_valid(self, min_length: int = MIN_CHINESE_CHARS) -> bool:
         """检查内容是否有效（只统计中文字符长度是否足够）"""
-        summary = self.extract_summary()
-        # 只统计中文字符（Unicode范围：\u4e00-\u9fff）
-        chinese_chars = re.findall(r'[\u4e00-\u9fff]', summary)
-        chinese_char_count = len(chinese_chars)
-        is_valid = chinese_char_count >= min_length
-        logger.debug(f"内容有效性检查: 中文字符数={chinese_char_count}, 最小要求={min_length}, 结果={is_valid}")
+        # 只统计中文字符（Unicode范围：\u4e00-\u9fff），已统计过时直接比较，否则数到最小要求即停止
+        if self._chinese_char_count is not None:
+            is_valid = self._chinese_char_count >= min_length
+        else:
+            is_valid = _has_chinese_chars(self.summary, min_length)
+        logger.debug("内容有效性检查: 最小要求=%d, 结果=%s", min_length, is_valid)
         return is_valid
 
     def extract_all(self) -> Optional[Dict[str, Any]]:
         """运行所有提取方法并返回结构化字典，如果内容太短则返回None"""
         # 先检查内容是否有效
         if not self.is_content_valid():
-            # 显示完整的话题内容，方便查看为什么被跳过
-            title = self.extract_title()
-            summary = self.extract_summary()
-            chinese_chars = re.findall(r'[\u4e00-\u9fff]', summary)
-            chinese_char_count = len(chinese_chars)
-            
-            logger.info(f"话题内容太短，跳过处理 (中文字符数: {chinese_char_count}/50)")
-            logger.info(f"跳过话题标题: {title}")
-            logger.info(f"跳过话题内容: {summary}")
-            logger.info("=" * 80)
+            # 逐条跳过只记DEBUG，汇总数量由调用方以INFO输出
+            logger.debug("话题内容太短，跳过处理 (中文字符数: %d/%d): %s | 内容: %s",
+                         self.chinese_char_count, MIN_CHINESE_CHARS, self.extract_title(), self.summary)
             return None
         
         title = self.extract_title()
         date = self.extract_date()
-        summary = self.extract_summary()
+        summary = self.summary
         
-        logger.debug(f"提取完成 - 标题: {title[:30]}..., 日期: {date}, 摘要长度: {len(summary)}")
+        logger.debug("提取完成 - 标题: %s..., 日期: %s, 摘要长度: %d", title[:30], date, len(summary))
         
         return {
             "title": title,
@@ -91,4 +137,4 @@ if __name__ == '__main__':
     extractor = TextExtractor(mock_topic)
     result = extractor.extract_all()
     print("提取结果:", result)
-    print("中文字符数:", len(re.findall(r'[\u4e00-\u9fff]', result['summary'])) if result else 0)
+    print("中文字符数:", _count_chinese_chars(result['summary']) if result else 0)
@@ -6,59 +6,154 @@
 import re
 import json
 import os
-from typing import Optional, List, Dict, Tuple
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, List, Dict, NamedTuple, Tuple
 from difflib import SequenceMatcher
 import time
 
 import akshare as ak
+import numpy as np
 import pandas as pd
 
+# 可选依赖：rapidfuzz 以C++实现相似度计算，未安装时回退到 difflib.SequenceMatcher
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    fuzz = None
+    process = None
+    RAPIDFUZZ_AVAILABLE = False
+
 from utils import get_logger
 
 logger = get_logger(__name__)
 
+# 公司名称清理：一次匹配同时去除前缀（ST、*ST、N、C）和一个常见后缀
+# 后缀按长度从长到短排列，保证“集团有限公司”等整体去除而不是只去掉“有限公司”
+_NAME_SUFFIXES = ['集团有限公司', '科技有限公司', '控股有限公司', '股份有限公司', '有限公司',
+                  '集团', '控股', '科技', '股份', '公司']
+_CLEAN_NAME_RE = re.compile(
+    r'^(?:\*?ST|N|C)?\s*(.*?)\s*(?:' + '|'.join(_NAME_SUFFIXES) + r')?\s*$', re.DOTALL
+)
+
+class _StockIndex(NamedTuple):
+    """
+    股票数据及其查询索引的不可变快照
+
+    后台刷新时整体替换为新快照，查询方先取出快照再使用，不会读到新旧混杂的数据
+    """
+    stock_data: Dict[str, Dict]
+    codes: List[str]                          # 序号 -> 代码（与 stock_data 的顺序一致）
+    names: List[str]                          # 序号 -> 原名称（模糊匹配用）
+    clean_names: List[str]                    # 序号 -> 清理名称（模糊匹配用）
+    name_index: Dict[str, str]                # 原名称 -> 代码
+    clean_name_index: Dict[str, str]          # 清理名称 -> 代码
+    bigram_index: Dict[str, List[int]]        # 名称中的二字片段 -> 序号列表
+    clean_name_trie: Dict[str, Any]           # 清理名称的字典树，结束节点的 _TRIE_END 键为序号列表
+
+# 字典树结束节点上存放序号列表的键（空字符串不会是名称中的字符）
+_TRIE_END = ''
+
+def _build_index(stock_data: Dict[str, Dict]) -> _StockIndex:
+    """
+    根据股票数据构建查询索引，使名称匹配由逐只扫描变为哈希查找
+
+    同名时保留 stock_data 中靠前的股票，与逐只扫描时的结果一致
+    """
+    codes = list(stock_data)
+    name_index: Dict[str, str] = {}
+    clean_name_index: Dict[str, str] = {}
+    bigram_sets: Dict[str, set] = {}
+    clean_name_trie: Dict[str, Any] = {}
+    
+    for ordinal, code in enumerate(codes):
+        info = stock_data[code]
+        name, clean_name = info['name'], info['clean_name']
+        name_index.setdefault(name, code)
+        clean_name_index.setdefault(clean_name, code)
+        node = clean_name_trie
+        for char in clean_name:
+            node = node.setdefault(char, {})
+        node.setdefault(_TRIE_END, []).append(ordinal)
+        for text in (name, clean_name):
+            for i in range(len(text) - 1):
+                bigram_sets.setdefault(text[i:i + 2], set()).add(ordinal)
+    
+    return _StockIndex(
+        stock_data=stock_data,
+        codes=codes,
+        names=[stock_data[code]['name'] for code in codes],
+        clean_names=[stock_data[code]['clean_name'] for code in codes],
+        name_index=name_index,
+        clean_name_index=clean_name_index,
+        bigram_index={bigram: sorted(ordinals) for bigram, ordinals in bigram_sets.items()},
+        clean_name_trie=clean_name_trie,
+    )
+
 class StockDatabase:
     """股票数据库类，负责获取和管理股票清单"""
     
-    def __init__(self, cache_file: str = "data/stock_cache.json"):
+    # 旧版JSON缓存文件，新缓存文件不存在时从这里迁移
+    LEGACY_JSON_CACHE_FILE = "data/stock_cache.json"
+    
+    def __init__(self, cache_file: str = "data/stock_cache.pkl"):
         self.cache_file = cache_file
         self.stock_data: Dict[str, Dict] = {}
         self.last_update: float = 0
         self.cache_expire_hours = 24  # 缓存24小时
         
+        # 股票数据的查询索引快照，数据更新时整体替换
+        self._index: _StockIndex = _build_index({})
+        # 保证同一时间只有一个更新任务在拉取数据
+        self._update_lock = threading.Lock()
+        
         # 确保数据目录存在
         os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
         
         # 加载缓存
         self._load_cache()
         
-        # 如果缓存过期或为空，更新数据
-        if self._is_cache_expired() or not self.stock_data:
+        # 缓存为空时必须同步获取；缓存过期但可用时先使用旧数据，在后台刷新
+        if not self.stock_data:
             self.update_stock_data()
+        elif self._is_cache_expired():
+            logger.info("股票数据缓存已过期，先使用缓存数据并在后台刷新")
+            self.refresh_async()
     
     def _load_cache(self) -> None:
-        """从缓存文件加载股票数据"""
+        """从缓存文件加载股票数据（pickle格式；不存在时尝试读取旧版JSON缓存）"""
         try:
             if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                with open(self.cache_file, 'rb') as f:
+                    cache_data = pickle.load(f)
+            elif os.path.exists(self.LEGACY_JSON_CACHE_FILE):
+                with open(self.LEGACY_JSON_CACHE_FILE, 'r', encoding='utf-8') as f:
                     cache_data = json.load(f)
-                    self.stock_data = cache_data.get('stock_data', {})
-                    self.last_update = cache_data.get('last_update', 0)
-                logger.info(f"从缓存加载了 {len(self.stock_data)} 只股票数据")
+            else:
+                return
+            stock_data = cache_data.get('stock_data', {})
+            # 清理规则可能已更新，按当前规则重新计算清理名称，保证与查询时一致
+            for info in stock_data.values():
+                info['clean_name'] = self._clean_company_name(info['name'])
+            self._swap_in(stock_data, cache_data.get('last_update', 0))
+            logger.info(f"从缓存加载了 {len(self.stock_data)} 只股票数据")
         except Exception as e:
             logger.warning(f"缓存加载失败: {e}")
-            self.stock_data = {}
-            self.last_update = 0
+            self._swap_in({}, 0)
     
     def _save_cache(self) -> None:
-        """保存股票数据到缓存文件"""
+        """保存股票数据到缓存文件（pickle二进制格式，先写临时文件再替换，避免写入中断损坏缓存）"""
         try:
             cache_data = {
                 'stock_data': self.stock_data,
                 'last_update': self.last_update
             }
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(cache_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
             logger.info(f"已保存 {len(self.stock_data)} 只股票数据到缓存")
         except Exception as e:
             logger.error(f"缓存保存失败: {e}")
@@ -71,52 +166,103 @@ class StockDatabase:
         hours_passed = (time.time() - self.last_update) / 3600
         return hours_passed > self.cache_expire_hours
     
+    def _swap_in(self, stock_data: Dict[str, Dict], last_update: float) -> None:
+        """用新数据构建索引快照并整体替换，查询方始终看到完整的一份数据"""
+        self._index = _build_index(stock_data)
+        self.stock_data = stock_data
+        self.last_update = last_update
+    
     def update_stock_data(self) -> None:
-        """更新股票数据（A股+港股）"""
+        """更新股票数据（A股+港股），同一时间只有一个更新任务执行"""
+        with self._update_lock:
+            self._update_stock_data_locked()
+    
+    def refresh_async(self) -> None:
+        """在后台线程中更新股票数据，期间查询继续使用旧数据；已有更新任务在执行时直接返回"""
+        if not self._update_lock.acquire(blocking=False):
+            return
+        
+        def run():
+            try:
+                self._update_stock_data_locked()
+            except Exception as e:
+                logger.error(f"后台更新股票数据失败: {e}")
+            finally:
+                self._update_lock.release()
+        
+        threading.Thread(target=run, name="stock-data-refresh", daemon=True).start()
+    
+    def _update_stock_data_locked(self) -> None:
+        """更新股票数据的实际逻辑，调用方须持有 _update_lock"""
         logger.info("开始更新股票数据...")
-        self.stock_data = {}
+        # A股和港股列表互不依赖，在两个线程中同时获取，耗时取决于较慢的一个
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="stock-list") as executor:
+            a_future = executor.submit(self._fetch_a_shares)
+            hk_future = executor.submit(self._fetch_hk_shares)
+            a_shares, hk_shares = a_future.result(), hk_future.result()
+        
+        # 全部数据源都失败时保留现有数据，不用空数据覆盖可用的缓存
+        if not a_shares and not hk_shares and self.stock_data:
+            logger.warning("未获取到任何股票数据，继续使用现有缓存")
+            return
         
-        # 获取A股数据
-        self._fetch_a_shares()
+        # 只有一个市场获取失败时，该市场沿用现有缓存中的数据
+        partial = False
+        for market, fetched in (('A', a_shares), ('HK', hk_shares)):
+            if not fetched:
+                partial = True
+                fetched.update(
+                    (code, info) for code, info in self.stock_data.items() if info.get('market') == market
+                )
+                logger.warning(f"未获取到{market}股数据，沿用现有缓存中的 {len(fetched)} 只")
         
-        # 获取港股数据  
-        self._fetch_hk_shares()
+        # 按A股、港股的顺序合并，同名股票匹配时仍优先A股
+        stock_data: Dict[str, Dict] = {**a_shares, **hk_shares}
         
-        # 更新时间戳并保存缓存
-        self.last_update = time.time()
-        self._save_cache()
+        if partial:
+            # 重建查询索引但不更新时间戳、不保存缓存，下次加载时仍视为过期并重新获取
+            self._swap_in(stock_data, self.last_update)
+        else:
+            # 重建查询索引并整体替换，更新时间戳并保存缓存
+            self._swap_in(stock_data, time.time())
+            self._save_cache()
         
         logger.info(f"股票数据更新完成，共 {len(self.stock_data)} 只股票")
     
-    def _fetch_a_shares(self) -> None:
-        """获取A股列表"""
+    def _fetch_a_shares(self) -> Dict[str, Dict]:
+        """获取A股列表，失败时返回空字典"""
+        stock_data: Dict[str, Dict] = {}
         try:
             logger.info("正在获取A股列表...")
             # 获取沪深股票基本信息
             df_a = ak.stock_info_a_code_name()
             
-            for _, row in df_a.iterrows():
-                code = str(row['code']).zfill(6)  # 确保6位代码
-                name = str(row['name']).strip()
-                
-                # 清理名称（去除ST、*ST等前缀）
-                clean_name = self._clean_company_name(name)
-                
-                self.stock_data[code] = {
+            # 整列处理代码和名称，避免逐行 iterrows
+            codes = df_a['code'].astype(str).str.zfill(6)  # 确保6位代码
+            names = df_a['name'].astype(str).str.strip()
+            # 清理名称（去除ST、*ST等前缀）
+            clean_names = names.map(self._clean_company_name)
+            exchanges = np.where(codes.str.match(r'^(?:60|68|51)'), 'SH', 'SZ')
+            
+            for code, name, clean_name, exchange in zip(codes, names, clean_names, exchanges):
+                stock_data[code] = {
                     'code': code,
                     'name': name,
                     'clean_name': clean_name,
                     'market': 'A',
-                    'exchange': 'SH' if code.startswith(('60', '68', '51')) else 'SZ'
+                    'exchange': str(exchange)
                 }
             
-            logger.info(f"获取到 {len([k for k, v in self.stock_data.items() if v['market'] == 'A'])} 只A股")
+            logger.info(f"获取到 {len(stock_data)} 只A股")
             
         except Exception as e:
             logger.error(f"获取A股数据失败: {e}")
+        
+        return stock_data
     
-    def _fetch_hk_shares(self) -> None:
-        """获取港股列表"""
+    def _fetch_hk_shares(self) -> Dict[str, Dict]:
+        """获取港股列表，失败时返回空字典"""
+        stock_data: Dict[str, Dict] = {}
         try:
             logger.info("正在获取港股列表...")
             
@@ -169,37 +315,30 @@ class StockDatabase:
                         logger.info(f"使用默认列映射: 代码列={symbol_col}, 名称列={name_col}")
                     else:
                         logger.error(f"无法确定港股数据的列结构: {columns}")
-                        return
+                        return stock_data
+                
+                # 整列处理代码和名称，并一次性过滤无效数据，避免逐行 iterrows
+                # （港股代码通常是5位数字）
+                codes = df_hk[symbol_col].astype(str).str.strip()
+                names = df_hk[name_col].astype(str).str.strip()
+                valid = (codes != '') & (names != '') & ~codes.isin(['nan', 'None']) & ~names.isin(['nan', 'None'])
+                codes, names = codes[valid], names[valid]
+                # 清理名称
+                clean_names = names.map(self._clean_company_name)
                 
                 processed_count = 0
-                for _, row in df_hk.iterrows():
-                    try:
-                        # 港股代码通常是5位数字
-                        code = str(row[symbol_col]).strip()
-                        name = str(row[name_col]).strip()
-                        
-                        # 跳过无效数据
-                        if not code or not name or code in ['nan', 'None'] or name in ['nan', 'None']:
-                            continue
-                        
-                        # 清理名称
-                        clean_name = self._clean_company_name(name)
-                        
-                        # 港股代码格式：原代码.HK
-                        hk_code = f"{code}.HK"
-                        
-                        self.stock_data[hk_code] = {
-                            'code': hk_code,
-                            'name': name,
-                            'clean_name': clean_name,
-                            'market': 'HK',
-                            'exchange': 'HK'
-                        }
-                        processed_count += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"处理港股数据行失败: {e}")
-                        continue
+                for code, name, clean_name in zip(codes, names, clean_names):
+                    # 港股代码格式：原代码.HK
+                    hk_code = f"{code}.HK"
+                    
+                    stock_data[hk_code] = {
+                        'code': hk_code,
+                        'name': name,
+                        'clean_name': clean_name,
+                        'market': 'HK',
+                        'exchange': 'HK'
+                    }
+                    processed_count += 1
                 
                 logger.info(f"成功处理 {processed_count} 只港股")
             else:
@@ -209,38 +348,47 @@ class StockDatabase:
             logger.error(f"获取港股数据失败: {e}")
         
         # 统计并记录港股数量
-        hk_count = len([k for k, v in self.stock_data.items() if v['market'] == 'HK'])
-        logger.info(f"最终获取到 {hk_count} 只港股")
+        logger.info(f"最终获取到 {len(stock_data)} 只港股")
+        return stock_data
     
     def _clean_company_name(self, name: str) -> str:
-        """清理公司名称，去除特殊标记和后缀"""
-        # 去除ST、*ST、N、C等前缀
-        cleaned = re.sub(r'^(\*?ST|N|C)', '', name).strip()
-        
-        # 去除常见后缀
-        suffixes = ['股份有限公司', '有限公司', '集团', '控股', '科技', '股份', '公司', 
-                   '集团有限公司', '科技有限公司', '控股有限公司']
-        for suffix in suffixes:
-            if cleaned.endswith(suffix):
-                cleaned = cleaned[:-len(suffix)].strip()
-                break
-        
-        return cleaned
+        """清理公司名称，去除特殊标记（ST、*ST、N、C等前缀）和常见后缀"""
+        match = _CLEAN_NAME_RE.match(name)
+        return match.group(1).strip() if match else name.strip()
 
 class SmartTickerMapper:
     """智能股票代码映射器"""
     
     def __init__(self):
         self.db = StockDatabase()
+        # 查询结果缓存：公司名称 -> 股票代码（未找到时为None），股票数据更新后清空
+        self._lookup_cache: Dict[str, Optional[str]] = {}
+        self._lookup_cache_index: Optional[_StockIndex] = None
         logger.info(f"智能映射器初始化完成，股票数据库包含 {len(self.db.stock_data)} 只股票")
     
     def find_ticker(self, company_name: str) -> Optional[str]:
-        """智能查找股票代码"""
+        """智能查找股票代码，同一名称在股票数据不变期间只匹配一次"""
         if not company_name or not company_name.strip():
             return None
         
         company_name = company_name.strip()
         
+        # 股票数据已被替换为新快照时，旧的查询结果作废
+        index = self.db._index
+        if self._lookup_cache_index is not index:
+            self._lookup_cache = {}
+            self._lookup_cache_index = index
+        
+        lookup_cache = self._lookup_cache
+        if company_name in lookup_cache:
+            return lookup_cache[company_name]
+        
+        result = self._match_ticker(company_name)
+        lookup_cache[company_name] = result
+        return result
+    
+    def _match_ticker(self, company_name: str) -> Optional[str]:
+        """依次尝试各级匹配策略查找股票代码"""
         # 1. 精确匹配（原名称）
         exact_match = self._exact_match(company_name)
         if exact_match:
@@ -266,49 +414,60 @@ class SmartTickerMapper:
     
     def _exact_match(self, company_name: str) -> Optional[str]:
         """精确匹配（原名称）"""
-        for code, info in self.db.stock_data.items():
-            if info['name'] == company_name:
-                return code
-        return None
+        return self.db._index.name_index.get(company_name)
     
     def _clean_name_match(self, company_name: str) -> Optional[str]:
         """清理名称匹配"""
         cleaned_input = self.db._clean_company_name(company_name)
-        
-        for code, info in self.db.stock_data.items():
-            if info['clean_name'] == cleaned_input:
-                return code
-        return None
+        return self.db._index.clean_name_index.get(cleaned_input)
     
     def _contain_match(self, company_name: str) -> Optional[str]:
         """包含匹配"""
+        index = self.db._index
+        # 候选项：(优先级, -清理名称长度, 序号)，序号保证同分时与逐只扫描的先后顺序一致
         candidates = []
         
         # 优先匹配：股票清理名称包含输入
-        for code, info in self.db.stock_data.items():
+        # 取输入中最少见的二字片段的倒排列表作为候选，再逐个确认
+        if len(company_name) >= 2:
+            postings = [index.bigram_index.get(company_name[i:i + 2], []) for i in range(len(company_name) - 1)]
+            ordinals = min(postings, key=len)
+        else:
+            ordinals = range(len(index.codes))
+        for ordinal in ordinals:
+            info = index.stock_data[index.codes[ordinal]]
             if company_name in info['clean_name'] or company_name in info['name']:
-                candidates.append((code, info, 1))  # 高优先级
+                candidates.append((1, -len(info['clean_name']), ordinal))  # 高优先级
         
-        # 次优匹配：输入包含股票清理名称  
-        for code, info in self.db.stock_data.items():
-            if info['clean_name'] in company_name and len(info['clean_name']) >= 2:
-                candidates.append((code, info, 2))  # 低优先级
+        # 次优匹配：输入包含股票清理名称，从输入的每个位置沿字典树向后匹配，无后续分支时提前结束
+        for start in range(len(company_name)):
+            node = index.clean_name_trie
+            for end in range(start, len(company_name)):
+                node = node.get(company_name[end])
+                if node is None:
+                    break
+                length = end - start + 1
+                if length >= 2:
+                    for ordinal in node.get(_TRIE_END, ()):
+                        candidates.append((2, -length, ordinal))  # 低优先级
         
         if candidates:
             # 按优先级和名称长度排序
-            candidates.sort(key=lambda x: (x[2], -len(x[1]['clean_name'])))
-            return candidates[0][0]
+            return index.codes[min(candidates)[2]]
         
         return None
     
     def _fuzzy_match(self, company_name: str, threshold: float = 0.6) -> Optional[str]:
         """模糊匹配，使用相似度算法"""
+        cleaned_input = self.db._clean_company_name(company_name)
+        
+        if RAPIDFUZZ_AVAILABLE:
+            return self._fuzzy_match_rapidfuzz(cleaned_input, threshold)
+        
         best_match = None
         best_score = 0
         
-        cleaned_input = self.db._clean_company_name(company_name)
-        
-        for code, info in self.db.stock_data.items():
+        for code, info in self.db._index.stock_data.items():
             # 计算与清理名称的相似度
             score1 = SequenceMatcher(None, cleaned_input, info['clean_name']).ratio()
             score2 = SequenceMatcher(None, cleaned_input, info['name']).ratio()
@@ -320,15 +479,41 @@ class SmartTickerMapper:
                 best_match = code
         
         return best_match
+    
+    def _fuzzy_match_rapidfuzz(self, cleaned_input: str, threshold: float) -> Optional[str]:
+        """
+        模糊匹配的rapidfuzz实现：分别在清理名称和原名称中取最相似者，低于阈值的候选在C++层直接跳过
 
+        注意：fuzz.ratio 与 SequenceMatcher.ratio 的语义不同。fuzz.ratio 基于最长公共子序列
+        (Indel距离)，SequenceMatcher 基于递归查找的最长连续匹配块，因此 fuzz.ratio 总是
+        不低于 SequenceMatcher，同一阈值下可能多接受一些候选，少数情况下最佳候选也会不同。
+        0.6 阈值用历史输出中约1800个真实标的名称（及其删字、加"股份/集团"后缀的变体）
+        核对过，两种实现的匹配结果一致，故沿用。
+        """
+        index = self.db._index
+        best = None  # (-相似度, 序号)：相似度相同时取靠前的股票
+        for names in (index.clean_names, index.names):
+            result = process.extractOne(
+                cleaned_input, names, scorer=fuzz.ratio, score_cutoff=threshold * 100
+            )
+            if result is not None:
+                _, score, ordinal = result
+                if best is None or (-score, ordinal) < best:
+                    best = (-score, ordinal)
+        
+        return index.codes[best[1]] if best else None
+    
 # 全局映射器实例
 _mapper_instance: Optional[SmartTickerMapper] = None
+_mapper_lock = threading.Lock()
 
 def get_ticker_mapper() -> SmartTickerMapper:
-    """获取全局映射器实例（单例模式）"""
+    """获取全局映射器实例（单例模式，多线程并发首次调用时也只创建一次）"""
     global _mapper_instance
     if _mapper_instance is None:
-        _mapper_instance = SmartTickerMapper()
+        with _mapper_lock:
+            if _mapper_instance is None:
+                _mapper_instance = SmartTickerMapper()
     return _mapper_instance
 
 def get_ticker_by_company_name(company_name: str) -> Optional[str]:
@@ -1,30 +1,64 @@
 """
 LLM智能信息提取器模块：使用OpenAI API从文本中提取投资相关信息
 """
+import asyncio
+import bisect
+import functools
+import hashlib
 import json
-from typing import Dict, Optional, List, Tuple, Union, Any
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, List, Tuple, Union, Any
 
-from openai import OpenAI
-from config import OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL, TEMPERATURE, FINANCE
-from utils import get_logger
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from config import OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL, TEMPERATURE, LLM_SEED, FINANCE, LLM_BATCH_SIZE, LLM_MAX_CONCURRENCY
+from utils import get_logger, json_loads
 
 # 设置日志器
 logger = get_logger(__name__)
 
-# 初始化OpenAI客户端（支持DeepSeek API）
-客户端 = None
-if OPENAI_API_KEY:
+# 连接池上限：httpx 默认的连接数不足以支撑 LLM_MAX_CONCURRENCY 路并发，请求会排队等待空闲连接
+_连接池限制 = httpx.Limits(
+    max_connections=max(100, LLM_MAX_CONCURRENCY * 2),
+    max_keepalive_connections=max(50, LLM_MAX_CONCURRENCY),
+)
+
+@functools.lru_cache(maxsize=1)
+def _获取客户端() -> Optional[OpenAI]:
+    """
+    初始化OpenAI客户端（支持DeepSeek API）
+
+    首次调用时才创建并缓存，仅导入本模块（如只转换CSV）时不产生初始化开销
+    """
+    if not OPENAI_API_KEY:
+        logger.warning("未找到OPENAI_API_KEY，LLM提取功能将被禁用")
+        return None
     try:
         客户端 = OpenAI(
             api_key=OPENAI_API_KEY,
-            base_url=OPENAI_API_BASE
+            base_url=OPENAI_API_BASE,
+            http_client=DefaultHttpxClient(limits=_连接池限制)
         )
         logger.info(f"API客户端初始化成功 - Base URL: {OPENAI_API_BASE}, Model: {OPENAI_MODEL}")
+        return 客户端
     except Exception as e:
         logger.error(f"API客户端初始化失败: {e}")
-        客户端 = None
-else:
-    logger.warning("未找到OPENAI_API_KEY，LLM提取功能将被禁用")
+        return None
+
+# 提示词版本：修改系统提示词或结果结构后需递增，使旧的缓存结果失效
+PROMPT_VERSION = "v2"
+
+# LLM结果缓存（按 模型+提示词版本+文本 的哈希存储原始JSON结果）
+LLM_CACHE_FILE = "data/llm_cache.db"
+LLM_CACHE_TTL = 30 * 86400  # 缓存结果的有效期（秒），过期后重新请求
+_缓存锁 = threading.Lock()
+_缓存连接: Optional[sqlite3.Connection] = None
+_缓存不可用 = False
+_内存缓存: Dict[str, str] = {}
 
 # 兼容：旧版本系统提示词（FINANCE=True时使用）
 旧版系统提示词_TEMPLATE = """
@@ -68,40 +102,147 @@ else:
 请严格按照JSON格式返回，包含"target"、"sector"、"brief"、"reason"、"expectation"五个字段，不要包含任何其他文字说明。
 """
 
-新版系统提示词_TEMPLATE = f"""你是一位专业的金融分析师AI助手。请从以下文本中提取**所有投资标的，并按行业板块归类**，每个板块下可有多个标的，无数量上限。
-
-【提取规则】
-1. 只要出现公司、股票、ETF、基金名，都算标的。必须全提取。
-2. 对每个标的，判断其主要所属行业板块。板块用简洁中文命名，如 新能源、半导体、AI、医药、军工……
-3. 输出JSON（必须严格结构化）：
-   - sector_targets: 数组。每元素形如 {{"sector":"新能源", "targets":"宁德时代,阳光电源"}}
-   - brief: 50-100字高度浓缩摘要（含板块、核心事件、主要标的）
-   - reason: 60-100字提炼推荐理由
-   - expectation: ≤100字，列出股价/业绩/趋势等具体可量化预期
-4. 若全文无任何标的，sector_targets返回[]，其他字段留空即可。
-
-【输出示例】
-{{
-  "sector_targets":[
-    {{"sector":"新能源", "targets":"宁德时代,阳光电源"}},
-    {{"sector":"半导体", "targets":"中芯国际"}}
-  ],
-  "brief":"宁德时代固态电池突破，带动新能源产业链整体受益。",
-  "reason":"固态电池进展快，技术落地驱动多公司增长。",
-  "expectation":"年内新能源板块整体有望上涨10%以上。"
-}}
+新版系统提示词_TEMPLATE = """你是一位专业的金融分析师AI助手。请从文本中提取**所有投资标的**（出现的公司、股票、ETF、基金名都算，必须全部提取），并按各自的主要行业板块归类，每个板块下的标的数量不限。板块用简洁中文命名，如新能源、半导体、AI、医药、军工。
+
+只输出JSON对象：{"sector_targets":[{"sector":"新能源","targets":"宁德时代,阳光电源"}],"brief":"50-100字摘要，含板块、核心事件、主要标的","reason":"60-100字推荐理由","expectation":"不超过100字的股价/业绩/趋势等可量化预期"}
+全文无任何标的时sector_targets返回[]，其他字段留空。
 
 【待分析文本】：
 """
 
+# 批量模式追加在系统提示词之后的说明：一次请求分析多段文本，按编号返回各自的结果
+批量模式说明 = """
+
+【批量模式】
+本次会提供多段待分析文本，每段以单独一行的"[编号]"开头。请对每段文本分别独立按上述要求提取，互不参考。
+输出一个JSON对象：{"results":[{"idx":编号, ...该段文本的提取结果字段...}, ...]}
+每段文本必须对应results中的一个元素，不得遗漏，idx与文本编号一致。
+"""
+
+# 单段文本提取结果的最大输出token数；批量请求按文本数等比放大
+# 提取结果通常在200-300 tokens，上限收紧后异常冗长的输出会更早截断（截断的结果不缓存）
+单条最大输出TOKENS = 400
+# 单条结果因达到上限被截断（finish_reason == "length"）时，以此上限重试一次，避免该话题被丢弃
+截断重试最大输出TOKENS = 600
+# 批量请求的输出token上限（DeepSeek单次最多输出8K）
+批量最大输出TOKENS = 8192
+
+# 导入时确定本次运行使用的系统提示词：每次请求发送完全相同的前缀，才能命中DeepSeek的提示词缓存
+_SYSTEM_PROMPT = (旧版系统提示词_TEMPLATE if FINANCE else 新版系统提示词_TEMPLATE).strip()
+_BATCH_SYSTEM_PROMPT = _SYSTEM_PROMPT + 批量模式说明
+
 def get_system_prompt() -> str:
     """
     根据FINANCE配置获取对应的静态系统提示词
     """
+    return _SYSTEM_PROMPT
+
+def _计算缓存键(文本: str) -> str:
+    """根据模型、提示词版本、FINANCE模式和文本内容计算缓存键（两种模式的提示词和结果结构不同）"""
+    原始键 = f"{OPENAI_MODEL}\x00{PROMPT_VERSION}\x00{int(FINANCE)}\x00{文本}"
+    return hashlib.blake2b(原始键.encode("utf-8"), digest_size=16).hexdigest()
+
+def _获取缓存连接() -> Optional[sqlite3.Connection]:
+    """获取（必要时创建）SQLite缓存连接，调用方需持有 _缓存锁"""
+    global _缓存连接, _缓存不可用
+    if _缓存连接 is None and not _缓存不可用:
+        try:
+            os.makedirs(os.path.dirname(LLM_CACHE_FILE), exist_ok=True)
+            连接 = sqlite3.connect(LLM_CACHE_FILE, check_same_thread=False)
+            # WAL + NORMAL：每次写入不再强制fsync，避免并发提取时阻塞在磁盘同步上
+            连接.execute("PRAGMA journal_mode=WAL")
+            连接.execute("PRAGMA synchronous=NORMAL")
+            连接.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, prompt_version TEXT, result TEXT, created_at REAL)"
+            )
+            _缓存连接 = 连接
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM结果缓存不可用，将直接调用API: {e}")
+            _缓存不可用 = True
+    return _缓存连接
+
+def _读取缓存(缓存键: str) -> Optional[str]:
+    """按缓存键读取LLM原始结果，先查内存再查磁盘"""
+    with _缓存锁:
+        if 缓存键 in _内存缓存:
+            return _内存缓存[缓存键]
+        连接 = _获取缓存连接()
+        if 连接 is None:
+            return None
+        try:
+            行 = 连接.execute(
+                "SELECT result FROM llm_cache WHERE key = ? AND created_at >= ?",
+                (缓存键, time.time() - LLM_CACHE_TTL)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取LLM结果缓存失败: {e}")
+            return None
+        if 行:
+            _内存缓存[缓存键] = 行[0]
+            return 行[0]
+    return None
+
+def _写入缓存(缓存键: str, 结果字符串: str) -> None:
+    """将LLM原始结果写入内存和磁盘缓存"""
+    _批量写入缓存([(缓存键, 结果字符串)])
+
+def _批量写入缓存(条目列表: List[Tuple[str, str]]) -> None:
+    """将多条 (缓存键, LLM原始结果) 写入内存缓存，并在一个事务中写入磁盘缓存"""
+    if not 条目列表:
+        return
+    with _缓存锁:
+        _内存缓存.update(条目列表)
+        连接 = _获取缓存连接()
+        if 连接 is None:
+            return
+        当前时间 = time.time()
+        try:
+            连接.executemany(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                [(缓存键, OPENAI_MODEL, PROMPT_VERSION, 结果字符串, 当前时间) for 缓存键, 结果字符串 in 条目列表]
+            )
+            连接.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"写入LLM结果缓存失败: {e}")
+
+def _空结果() -> dict:
+    """根据FINANCE配置返回空的提取结果"""
+    if FINANCE:
+        return {"target": None, "sector": None, "brief": None, "reason": None, "expectation": None}
+    else:
+        return {"sector_pairs": [], "brief": "", "reason": "", "expectation": ""}
+
+def _转换结果(结果: dict) -> dict:
+    """
+    根据FINANCE配置将LLM返回的JSON对象转换为结果字典
+    
+    Args:
+        结果 (dict): 已解析的LLM返回JSON对象
+        
+    Returns:
+        dict: 转换后的结果字典
+    """
     if FINANCE:
-        return 旧版系统提示词_TEMPLATE
+        # 兼容：旧版逻辑，返回target等字段
+        return {
+            "target": 结果.get("target"),
+            "sector": 结果.get("sector"),
+            "brief": 结果.get("brief"),
+            "reason": 结果.get("reason"), 
+            "expectation": 结果.get("expectation")
+        }
     else:
-        return 新版系统提示词_TEMPLATE
+        # 新版本：解析sector_targets并返回sector_pairs
+        sector_targets = 结果.get("sector_targets", [])
+        sector_pairs = [(item["sector"], item["targets"]) for item in sector_targets if isinstance(item, dict) and "sector" in item and "targets" in item]
+                
+        return {
+            "sector_pairs": sector_pairs,
+            "brief": 结果.get("brief", ""),
+            "reason": 结果.get("reason", ""),
+            "expectation": 结果.get("expectation", "")
+        }
 
 def parse_llm_result(content: str) -> dict:
     """
@@ -114,35 +255,80 @@ def parse_llm_result(content: str) -> dict:
         dict: 解析后的结果字典
     """
     try:
-        结果 = json.loads(content)
-        
-        if FINANCE:
-            # 兼容：旧版逻辑，返回target等字段
-            return {
-                "target": 结果.get("target"),
-                "sector": 结果.get("sector"),
-                "brief": 结果.get("brief"),
-                "reason": 结果.get("reason"), 
-                "expectation": 结果.get("expectation")
-            }
-        else:
-            # 新版本：解析sector_targets并返回sector_pairs
-            sector_targets = 结果.get("sector_targets", [])
-            sector_pairs = [(item["sector"], item["targets"]) for item in sector_targets if isinstance(item, dict) and "sector" in item and "targets" in item]
-                    
-            return {
-                "sector_pairs": sector_pairs,
-                "brief": 结果.get("brief", ""),
-                "reason": 结果.get("reason", ""),
-                "expectation": 结果.get("expectation", "")
-            }
-            
+        return _转换结果(json_loads(content))
     except (json.JSONDecodeError, KeyError) as e:
         logger.error(f"解析LLM结果时出错: {e}")
-        if FINANCE:
-            return {"target": None, "sector": None, "brief": None, "reason": None, "expectation": None}
+        return _空结果()
+
+def _添加采样参数(参数: Dict[str, Any]) -> Dict[str, Any]:
+    """配置了采样种子时加入请求参数"""
+    if LLM_SEED is not None:
+        参数["seed"] = LLM_SEED
+    return 参数
+
+def _构建请求参数(文本: str, 最大输出TOKENS: int = 单条最大输出TOKENS) -> Dict[str, Any]:
+    """构建chat.completions请求参数：静态系统提示词在前，动态文本在后"""
+    return _添加采样参数({
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": 文本} # 只把动态文本放在这里
+        ],
+        "temperature": TEMPERATURE,
+        "response_format": {"type": "json_object"},
+        "max_tokens": 最大输出TOKENS
+    })
+
+def _构建批量请求参数(文本列表: List[str]) -> Dict[str, Any]:
+    """构建一次分析多段文本的请求参数：每段文本以"[编号]"开头，按编号返回结果"""
+    用户消息 = "\n\n".join(f"[{序号}]\n{文本}" for 序号, 文本 in enumerate(文本列表))
+    return _添加采样参数({
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": _BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": 用户消息}
+        ],
+        "temperature": TEMPERATURE,
+        "response_format": {"type": "json_object"},
+        "max_tokens": min(单条最大输出TOKENS * len(文本列表), 批量最大输出TOKENS)
+    })
+
+def _输出被截断(响应: Any) -> bool:
+    """响应是否因达到max_tokens上限而被截断"""
+    return getattr(响应.choices[0], "finish_reason", None) == "length"
+
+def _记录缓存命中(响应: Any) -> None:
+    """记录DeepSeek提示词缓存命中情况和输出token数"""
+    if 响应.usage:
+        logger.debug("LLM输出tokens: %s", getattr(响应.usage, 'completion_tokens', None))
+        hit_tokens = getattr(响应.usage, 'prompt_cache_hit_tokens', 0) or 0
+        total_prompt = getattr(响应.usage, 'prompt_tokens', 0) or 0
+        if total_prompt > 0:
+            hit_rate = (hit_tokens / total_prompt) * 100
+            logger.info(f"🧠 DeepSeek缓存命中: {hit_tokens}/{total_prompt} tokens ({hit_rate:.1f}%)")
         else:
-            return {"sector_pairs": [], "brief": "", "reason": "", "expectation": ""}
+             logger.info("🧠 DeepSeek缓存: prompt_tokens为0，无法计算命中率")
+
+def _处理响应(响应: Any, 缓存键: str) -> dict:
+    """记录DeepSeek缓存命中情况，解析响应并缓存可解析的结果"""
+    # 1. 记录缓存命中情况
+    _记录缓存命中(响应)
+    
+    # 2. 解析结果
+    结果字符串 = 响应.choices[0].message.content
+    if not 结果字符串:
+        return _空结果()
+        
+    try:
+        结果 = json_loads(结果字符串)
+    except json.JSONDecodeError as e:
+        # 解析失败（如输出被截断）的结果不缓存，下次重新请求
+        logger.error(f"解析LLM结果时出错: {e}")
+        return _空结果()
+        
+    # 3. 仅缓存可解析的结果
+    _写入缓存(缓存键, 结果字符串)
+    return _转换结果(结果)
 
 def 提取股票信息(文本: str) -> Union[Dict[str, Optional[str]], Dict[str, Union[str, List[Tuple[str, str]]]]]:
     """
@@ -154,56 +340,284 @@ def 提取股票信息(文本: str) -> Union[Dict[str, Optional[str]], Dict[str,
     返回:
         Dict: 根据FINANCE配置返回不同格式的字典
     """
+    # 0. 相同文本直接返回缓存结果，避免重复调用API
+    缓存键 = _计算缓存键(文本)
+    缓存结果 = _读取缓存(缓存键)
+    if 缓存结果 is not None:
+        logger.debug("命中LLM结果缓存，跳过API调用")
+        return parse_llm_result(缓存结果)
+
+    客户端 = _获取客户端()
     if not 客户端:
         logger.error("OpenAI客户端未初始化，跳过LLM提取")
-        if FINANCE:
-            return {"target": None, "sector": None, "brief": None, "reason": None, "expectation": None}
-        else:
-            return {"sector_pairs": [], "brief": "", "reason": "", "expectation": ""}
+        return _空结果()
 
     try:
-        # 1. 获取静态系统提示词
-        系统提示词 = get_system_prompt()
-        
-        # 2. 构建优化的消息结构
-        # 将静态提示词和动态文本分开
-        响应 = 客户端.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": 系统提示词},
-                {"role": "user", "content": 文本} # 只把动态文本放在这里
-            ],
-            temperature=TEMPERATURE,
-            response_format={"type": "json_object"},
-            max_tokens=600
+        响应 = 客户端.chat.completions.create(**_构建请求参数(文本))
+        if _输出被截断(响应):
+            logger.info(f"LLM输出达到 {单条最大输出TOKENS} tokens 上限被截断，以 {截断重试最大输出TOKENS} tokens 上限重试")
+            响应 = 客户端.chat.completions.create(**_构建请求参数(文本, 截断重试最大输出TOKENS))
+        return _处理响应(响应, 缓存键)
+
+    except Exception as e:
+        logger.error(f"使用LLM提取信息时出错: {e}")
+        return _空结果()
+
+def _创建异步客户端() -> Optional[AsyncOpenAI]:
+    """
+    创建异步OpenAI客户端（支持DeepSeek API）
+    
+    异步客户端的连接池绑定在创建时的事件循环上，因此每次 asyncio.run 内单独创建并在结束时关闭。
+    """
+    if not OPENAI_API_KEY:
+        return None
+    try:
+        return AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_API_BASE,
+            http_client=DefaultAsyncHttpxClient(limits=_连接池限制)
         )
+    except Exception as e:
+        logger.error(f"异步API客户端初始化失败: {e}")
+        return None
+
+async def _发送请求(异步客户端: AsyncOpenAI, 请求参数: Dict[str, Any], 信号量: Optional[asyncio.Semaphore]) -> Any:
+    """发送一次chat.completions请求；给定信号量时只在请求期间占用一个名额"""
+    if 信号量 is None:
+        return await 异步客户端.chat.completions.create(**请求参数)
+    async with 信号量:
+        return await 异步客户端.chat.completions.create(**请求参数)
+
+async def 提取股票信息_async(文本: str, 异步客户端: Optional[AsyncOpenAI] = None,
+                             信号量: Optional[asyncio.Semaphore] = None) -> dict:
+    """
+    提取股票信息 的异步版本
+    
+    参数:
+        文本 (str): 需要分析的输入文本
+        异步客户端 (Optional[AsyncOpenAI]): 复用的异步客户端，为空时临时创建
+        信号量 (Optional[asyncio.Semaphore]): 限制同时进行的请求数，为空时不限制
         
-        # 3. 记录缓存命中情况
-        if 响应.usage:
-            hit_tokens = getattr(响应.usage, 'prompt_cache_hit_tokens', 0) or 0
-            total_prompt = getattr(响应.usage, 'prompt_tokens', 0) or 0
-            if total_prompt > 0:
-                hit_rate = (hit_tokens / total_prompt) * 100
-                logger.info(f"🧠 DeepSeek缓存命中: {hit_tokens}/{total_prompt} tokens ({hit_rate:.1f}%)")
-            else:
-                 logger.info("🧠 DeepSeek缓存: prompt_tokens为0，无法计算命中率")
-        
-        # 4. 解析结果
-        结果字符串 = 响应.choices[0].message.content
-        if not 结果字符串:
-            if FINANCE:
-                return {"target": None, "sector": None, "brief": None, "reason": None, "expectation": None}
-            else:
-                return {"sector_pairs": [], "brief": "", "reason": "", "expectation": ""}
-            
-        return parse_llm_result(结果字符串)
+    返回:
+        Dict: 根据FINANCE配置返回不同格式的字典
+    """
+    缓存键 = _计算缓存键(文本)
+    缓存结果 = _读取缓存(缓存键)
+    if 缓存结果 is not None:
+        logger.debug("命中LLM结果缓存，跳过API调用")
+        return parse_llm_result(缓存结果)
+
+    if 异步客户端 is None:
+        临时客户端 = _创建异步客户端()
+        if 临时客户端 is None:
+            logger.error("OpenAI客户端未初始化，跳过LLM提取")
+            return _空结果()
+        async with 临时客户端:
+            return await 提取股票信息_async(文本, 临时客户端, 信号量)
+
+    try:
+        响应 = await _发送请求(异步客户端, _构建请求参数(文本), 信号量)
+        if _输出被截断(响应):
+            logger.info(f"LLM输出达到 {单条最大输出TOKENS} tokens 上限被截断，以 {截断重试最大输出TOKENS} tokens 上限重试")
+            响应 = await _发送请求(异步客户端, _构建请求参数(文本, 截断重试最大输出TOKENS), 信号量)
+        # 解析并写入缓存（SQLite写入是阻塞的）放到线程中执行，不阻塞事件循环
+        return await asyncio.to_thread(_处理响应, 响应, 缓存键)
 
     except Exception as e:
         logger.error(f"使用LLM提取信息时出错: {e}")
-        if FINANCE:
-            return {"target": None, "sector": None, "brief": None, "reason": None, "expectation": None}
+        return _空结果()
+
+def _解析批量结果(结果字符串: str, 数量: int) -> Optional[Dict[int, dict]]:
+    """
+    解析批量请求返回的 {"results":[{"idx":编号, ...}, ...]}
+    
+    返回:
+        Optional[Dict[int, dict]]: 编号 -> 该段文本的结果（已去掉idx），整体无法解析时为None
+    """
+    try:
+        结果 = json_loads(结果字符串)
+    except json.JSONDecodeError as e:
+        logger.warning(f"解析批量LLM结果时出错: {e}")
+        return None
+    条目列表 = 结果.get("results") if isinstance(结果, dict) else None
+    if not isinstance(条目列表, list):
+        logger.warning("批量LLM结果缺少results数组")
+        return None
+    
+    映射: Dict[int, dict] = {}
+    for 条目 in 条目列表:
+        if not isinstance(条目, dict):
+            continue
+        序号 = 条目.pop("idx", None)
+        if isinstance(序号, int) and 0 <= 序号 < 数量 and 序号 not in 映射:
+            映射[序号] = 条目
+    return 映射
+
+async def 批量提取股票信息_async(文本列表: List[str], 异步客户端: AsyncOpenAI,
+                                 信号量: Optional[asyncio.Semaphore] = None) -> List[dict]:
+    """
+    在一次请求中提取多段文本的股票信息，多段文本共用一份系统提示词
+    
+    整批结果无法解析（如输出被截断）时二分后分别重试；个别文本缺少结果时只对缺少的部分重新请求；
+    只剩一段文本时退回单条提取。各段结果按单条提取的缓存键分别缓存。
+    信号量只在每次实际请求期间占用，二分和补充请求产生的子请求同样受并发上限约束。
+    
+    参数:
+        文本列表 (List[str]): 需要分析的文本列表
+        异步客户端 (AsyncOpenAI): 复用的异步客户端
+        信号量 (Optional[asyncio.Semaphore]): 限制同时进行的请求数，为空时不限制
+        
+    返回:
+        List[dict]: 与输入顺序一致的提取结果列表
+    """
+    if not 文本列表:
+        return []
+    if len(文本列表) == 1:
+        return [await 提取股票信息_async(文本列表[0], 异步客户端, 信号量)]
+
+    try:
+        响应 = await _发送请求(异步客户端, _构建批量请求参数(文本列表), 信号量)
+    except Exception as e:
+        logger.error(f"使用LLM批量提取信息时出错: {e}")
+        return [_空结果() for _ in 文本列表]
+    try:
+        _记录缓存命中(响应)
+        结果字符串 = 响应.choices[0].message.content or ""
+    except (AttributeError, IndexError, TypeError) as e:
+        # 响应缺少choices等异常结构按无法解析处理，走下面的二分重试
+        logger.warning(f"批量LLM响应格式异常: {e}")
+        结果字符串 = ""
+
+    映射 = _解析批量结果(结果字符串, len(文本列表))
+    if not 映射:
+        中点 = len(文本列表) // 2
+        logger.info(f"批量结果无法解析，拆分为 {中点} + {len(文本列表) - 中点} 段重试")
+        前半, 后半 = await asyncio.gather(
+            批量提取股票信息_async(文本列表[:中点], 异步客户端, 信号量),
+            批量提取股票信息_async(文本列表[中点:], 异步客户端, 信号量),
+        )
+        return 前半 + 后半
+
+    结果列表: List[Optional[dict]] = [None] * len(文本列表)
+    缺失序号 = []
+    待缓存: List[Tuple[str, str]] = []
+    for 序号, 文本 in enumerate(文本列表):
+        条目 = 映射.get(序号)
+        if 条目 is None:
+            缺失序号.append(序号)
+            continue
+        待缓存.append((_计算缓存键(文本), json.dumps(条目, ensure_ascii=False)))
+        结果列表[序号] = _转换结果(条目)
+    # 整批结果一个事务写入，且放到线程中执行，不阻塞事件循环；写缓存失败不影响已得到的结果
+    try:
+        await asyncio.to_thread(_批量写入缓存, 待缓存)
+    except Exception as e:
+        logger.warning(f"写入LLM结果缓存失败: {e}")
+
+    if 缺失序号:
+        logger.info(f"批量结果缺少 {len(缺失序号)} 段文本，重新请求")
+        补充结果 = await 批量提取股票信息_async([文本列表[序号] for 序号 in 缺失序号], 异步客户端, 信号量)
+        for 序号, 结果 in zip(缺失序号, 补充结果):
+            结果列表[序号] = 结果
+    return 结果列表  # type: ignore[return-value]
+
+# 按文本长度（字符数）分档的阈值：短 / 中 / 长，各档依次将批大小减半
+文本长度分档 = (1500, 4000)
+
+def _按长度分批(文本列表: List[str], batch_size: int) -> List[List[str]]:
+    """
+    按长度将文本分档后在档内分批，使同一批文本长度相近，避免一段长文本拖慢整批请求
+
+    短文本档使用 batch_size，之后每档批大小减半（最小为1）
+    """
+    各档文本: List[List[str]] = [[] for _ in range(len(文本长度分档) + 1)]
+    for 文本 in 文本列表:
+        各档文本[bisect.bisect_right(文本长度分档, len(文本))].append(文本)
+
+    批次列表 = []
+    for 档位, 档内文本 in enumerate(各档文本):
+        批大小 = max(1, batch_size >> 档位)
+        批次列表.extend(档内文本[起点:起点 + 批大小] for 起点 in range(0, len(档内文本), 批大小))
+    return 批次列表
+
+async def 批量提取(文本列表: List[str], concurrency: int = LLM_MAX_CONCURRENCY, batch_size: int = LLM_BATCH_SIZE,
+                进度回调: Optional[Callable[[int], None]] = None) -> List[dict]:
+    """
+    并发提取多段文本的股票信息
+    
+    先查结果缓存，未命中的文本按长度分档后在档内分批（见 _按长度分批），每批合并为一次请求，
+    使用信号量限制同时进行的请求数（包括重试产生的子请求）
+    
+    参数:
+        文本列表 (List[str]): 需要分析的文本列表
+        concurrency (int): 最大并发请求数
+        batch_size (int): 每次请求合并分析的短文本数，较长文本的批次会相应减小
+        进度回调 (Optional[Callable[[int], None]]): 每有一批文本完成（含缓存命中）时调用，参数为完成的文本数
+        
+    返回:
+        List[dict]: 与输入顺序一致的提取结果列表
+    """
+    if not 文本列表:
+        return []
+
+    def 报告进度(数量: int):
+        if 进度回调 is not None and 数量:
+            进度回调(数量)
+
+    结果列表: List[Optional[dict]] = [None] * len(文本列表)
+    # 未命中缓存的文本 -> 其在输入中的所有位置（相同文本只请求一次）
+    待提取: Dict[str, List[int]] = {}
+    for 序号, 文本 in enumerate(文本列表):
+        if 文本 in 待提取:
+            待提取[文本].append(序号)
+            continue
+        缓存结果 = _读取缓存(_计算缓存键(文本))
+        if 缓存结果 is not None:
+            结果列表[序号] = parse_llm_result(缓存结果)
+        else:
+            待提取[文本] = [序号]
+
+    报告进度(len(文本列表) - sum(map(len, 待提取.values())))
+
+    if 待提取:
+        logger.debug(f"LLM结果缓存命中 {len(文本列表) - sum(map(len, 待提取.values()))}/{len(文本列表)}")
+        异步客户端 = _创建异步客户端()
+        if 异步客户端 is None:
+            logger.error("OpenAI客户端未初始化，跳过LLM提取")
+            提取结果 = [_空结果() for _ in 待提取]
+            报告进度(sum(map(len, 待提取.values())))
         else:
-            return {"sector_pairs": [], "brief": "", "reason": "", "expectation": ""}
+            批次列表 = _按长度分批(list(待提取), max(1, batch_size))
+            信号量 = asyncio.Semaphore(concurrency)
+
+            async def 提取一批(批次: List[str]) -> List[dict]:
+                try:
+                    批结果 = await 批量提取股票信息_async(批次, 异步客户端, 信号量)
+                except Exception as e:
+                    # 一批失败只影响本批文本，不中断其他批次
+                    logger.error(f"LLM批量提取失败（{len(批次)} 段文本）: {e}")
+                    批结果 = [_空结果() for _ in 批次]
+                # 重复文本按其在输入中出现的次数计入进度
+                报告进度(sum(len(待提取[文本]) for 文本 in 批次))
+                return 批结果
+
+            async with 异步客户端:
+                各批结果 = await asyncio.gather(*(提取一批(批次) for 批次 in 批次列表))
+            文本结果 = {文本: 结果 for 批次, 批结果 in zip(批次列表, 各批结果) for 文本, 结果 in zip(批次, 批结果)}
+            提取结果 = [文本结果[文本] for 文本 in 待提取]
+
+        for 序号列表, 结果 in zip(待提取.values(), 提取结果):
+            for 序号 in 序号列表:
+                # 重复文本各自持有一份结果，避免调用方修改时互相影响
+                结果列表[序号] = dict(结果) if 序号 != 序号列表[0] else 结果
+
+    return 结果列表  # type: ignore[return-value]
+
+def 批量提取_sync(文本列表: List[str], concurrency: int = LLM_MAX_CONCURRENCY, batch_size: int = LLM_BATCH_SIZE) -> List[dict]:
+    """
+    批量提取 的同步封装（内部使用 asyncio.run，不能在已运行的事件循环中调用）
+    """
+    return asyncio.run(批量提取(文本列表, concurrency, batch_size))
 
 # 保持向后兼容的函数名
 def extract_stock_info(文本: str) -> Union[Dict[str, Optional[str]], Dict[str, Union[str, List[Tuple[str, str]]]]]:
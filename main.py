@@ -5,35 +5,93 @@
 按板块-标的对聚合数据，并将结果保存到CSV和JSON文件。
 """
 import argparse
+import asyncio
+import codecs
+import csv
 import json
 import logging
 import os
+import re
 import time
 from typing import List, Optional, Dict, Any, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-import pandas as pd
 from tqdm import tqdm
 
+# orjson 序列化比标准库快数倍，未安装时回退到 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import COOKIE, STAR_ID, FINANCE, AUTO_CONVERT_TO_EXCEL
 from utils import setup_logging, get_logger
-from extractor.client import 获取所有今日话题 as fetch_all_today_topics, 获取所有话题 as fetch_all_topics
+from extractor.client import 获取所有今日话题 as fetch_all_today_topics, 获取所有话题 as fetch_all_topics, 获取今日时间范围
 from extractor.text_extractor import TextExtractor
-from llm_filter.extractor import extract_stock_info
-from to_excel_converter import process_csv_to_excel # 导入转换函数
+from llm_filter.extractor import 批量提取
 
 # 当FINANCE=True时才导入价格相关模块（兼容）
 if FINANCE:
-    from extractor.price_fetcher import get_price
+    from extractor.price_fetcher import get_prices_batch
     from extractor.ticker_mapper import map_targets_to_tickers
 
 # --- 配置 ---
 输出目录 = "output"
 
+# 旧版CSV格式的列顺序
+旧版格式列名 = ['标题', '日期', '板块', '标的1', '价格1', '标的2', '价格2', '标的3', '价格3', '简述', '推荐理由', '预期', '原文']
+# 分割多个标的或价格的分隔符
+_标的分隔符_RE = re.compile(r'[,，;；、\s]+')
+# 投资相关关键词或代码：文本中一个都没有时几乎不可能提取出标的，直接跳过LLM分析
+# 只收投资语境专用的词（泛泛的"公司/市场/涨跌/%/亿"不算），外加形似代码的片段：
+# 6位A股代码、xxxx.HK港股代码、$开头或括号中的美股代码，以及研报标题常见的【机构团队】抬头
+_投资关键词_RE = re.compile(
+    r'股票|个股|股价|[A港美]股|概念股|基金|板块|标的|龙头|赛道|产业链|估值|重估|业绩|营收|净利|'
+    r'订单|产能|出货|销量|涨价|景气|催化|弹性|券商|研报|推荐|关注|目标价|评级|买入|增持|减持|'
+    r'看多|看空|受益|利好|利空|涨停|跌停|市盈率|市值|上市|【[^】\n]{2,20}】|'
+    r'(?<!\d)\d{6}(?!\d)|(?<!\d)\d{4,5}\.HK|\$[A-Z]{1,5}\b|[（(][A-Z]{1,5}[)）]'
+)
+
 # 设置日志系统
 logger = get_logger(__name__)
 
+# 行数少于该值时直接用标准库csv写出，省去构建DataFrame/Arrow表的开销
+CSV小结果行数上限 = 1000
+
+def 写入CSV(列数据: Dict[str, List[str]], csv路径: str) -> None:
+    """
+    将按列组织的结果写入带BOM的UTF-8 CSV（Excel可直接识别中文）
+
+    小结果直接用标准库csv写出；大结果优先使用 pyarrow 的CSV写入器，
+    未安装或列中混有无法统一类型的值时回退到 pandas
+    """
+    行数 = len(next(iter(列数据.values()), []))
+    if 行数 < CSV小结果行数上限:
+        with open(csv路径, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(列数据.keys())
+            writer.writerows(zip(*列数据.values()))
+        return
+    # 可选依赖：pyarrow 的CSV写入器（C++实现），只在大结果时按需导入，未安装时回退到 pandas.to_csv
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        pa = None
+    if pa is not None:
+        try:
+            表 = pa.Table.from_pydict(列数据)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.debug(f"pyarrow无法转换结果表，改用pandas写入CSV: {e}")
+        else:
+            with open(csv路径, 'wb') as f:
+                f.write(codecs.BOM_UTF8)
+                pa_csv.write_csv(表, f)
+            return
+    import pandas as pd  # 仅在回退路径使用，避免启动时导入
+    pd.DataFrame(列数据).to_csv(csv路径, index=False, encoding='utf-8-sig')
+
 def 保存结果(结果列表: List[dict], 仅今日: bool, 起始日期: str = "") -> Optional[str]:
     """
     将结果保存到CSV和JSON文件，并返回生成的CSV文件路径
@@ -54,17 +112,19 @@ def 保存结果(结果列表: List[dict], 仅今日: bool, 起始日期: str =
     daily_results_dir = os.path.join(base_dir, "daily_results")
     os.makedirs(daily_results_dir, exist_ok=True)
     
-    df = pd.DataFrame(转换后结果)
-    
     csv文件名 = f"{文件描述}.csv"
     csv路径 = os.path.join(daily_results_dir, csv文件名)
-    df.to_csv(csv路径, index=False, encoding='utf-8-sig')
+    写入CSV(转换后结果, csv路径)
     logger.info(f"每日结果已保存到 {csv路径}")
 
     json文件名 = f"{文件描述}.json"
     json路径 = os.path.join(daily_results_dir, json文件名)
-    with open(json路径, 'w', encoding='utf-8') as f:
-        json.dump(结果列表, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(json路径, 'wb') as f:
+            f.write(orjson.dumps(结果列表, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(json路径, 'w', encoding='utf-8') as f:
+            json.dump(结果列表, f, indent=2, ensure_ascii=False)
     logger.info(f"每日结果已保存到 {json路径}")
 
     # 输出统计信息
@@ -77,165 +137,143 @@ def 保存结果(结果列表: List[dict], 仅今日: bool, 起始日期: str =
 
     return csv路径
 
-def 转换为旧版格式(结果列表: List[dict]) -> List[dict]:
-    """兼容：转换为旧版CSV格式（包含价格字段）"""
-    转换后结果 = []
+_空三项 = ('', '', '')
+
+def _拆分前三项(值: str) -> Tuple[str, str, str]:
+    """按分隔符拆分标的/价格字符串，取前3项，不足3项的位置补空"""
+    各项 = [项.strip() for 项 in _标的分隔符_RE.split(值.strip(), maxsplit=3)[:3]]
+    return tuple(各项 + [''] * (3 - len(各项)))  # type: ignore[return-value]
+
+def 转换为旧版格式(结果列表: List[dict]) -> Dict[str, List[str]]:
+    """兼容：转换为旧版CSV格式（包含价格字段），按列返回以便直接写出CSV"""
+    if not 结果列表:
+        return {列名: [] for 列名 in 旧版格式列名}
+
+    # 解析投资标的（可能有多个）及对应价格，无标的时价格也留空
+    标的行, 价格行 = [], []
     for 数据 in 结果列表:
-        # 解析投资标的（可能有多个）
-        标的列表 = []
-        价格列表 = []
-        
-        if isinstance(数据.get('target'), str) and 数据['target']:
-            # 分割多个标的
-            import re
-            targets = re.split(r'[,，;；、\s]+', 数据['target'].strip()) if 数据['target'] else []
-            prices = re.split(r'[,，;；、\s]+', str(数据.get('price', '')).strip()) if 数据.get('price') else []
-            
-            # 确保至少有3个位置
-            while len(targets) < 3:
-                targets.append('')
-            while len(prices) < 3:
-                prices.append('')
-                
-            标的列表 = [t.strip() for t in targets[:3]]
-            价格列表 = [p.strip() for p in prices[:3]]
+        target = 数据.get('target')
+        if isinstance(target, str) and target:
+            price = 数据.get('price')
+            标的行.append(_拆分前三项(target))
+            价格行.append(_拆分前三项(str(price)) if price else _空三项)
         else:
-            标的列表 = ['', '', '']
-            价格列表 = ['', '', '']
-        
-        # 转换日期格式为时分
-        日期时分 = 提取时分信息(数据)
-        
-        转换后数据 = {
-            '标题': 数据.get('title', ''),
-            '日期': 日期时分,
-            '板块': 数据.get('sector', ''),
-            '标的1': 标的列表[0],
-            '价格1': 价格列表[0],
-            '标的2': 标的列表[1], 
-            '价格2': 价格列表[1],
-            '标的3': 标的列表[2],
-            '价格3': 价格列表[2],
-            '简述': 数据.get('brief', ''),
-            '推荐理由': 数据.get('reason', ''),
-            '预期': 数据.get('expectation', ''),
-            '原文': 数据.get('原文', '')
-        }
-        转换后结果.append(转换后数据)
-    
-    return 转换后结果
+            标的行.append(_空三项)
+            价格行.append(_空三项)
+    标的1, 标的2, 标的3 = map(list, zip(*标的行))
+    价格1, 价格2, 价格3 = map(list, zip(*价格行))
+
+    # 其余列逐列生成，顺序与 旧版格式列名 一致
+    return {
+        '标题': [数据.get('title', '') for 数据 in 结果列表],
+        '日期': [数据.get('时分', '') for 数据 in 结果列表],  # 日期列只保留时分
+        '板块': [数据.get('sector', '') for 数据 in 结果列表],
+        '标的1': 标的1, '价格1': 价格1,
+        '标的2': 标的2, '价格2': 价格2,
+        '标的3': 标的3, '价格3': 价格3,
+        '简述': [数据.get('brief', '') for 数据 in 结果列表],
+        '推荐理由': [数据.get('reason', '') for 数据 in 结果列表],
+        '预期': [数据.get('expectation', '') for 数据 in 结果列表],
+        '原文': [数据.get('原文', '') for 数据 in 结果列表],
+    }
 
-def 转换为板块标的对格式(结果列表: List[dict]) -> List[dict]:
-    """新版：转换为板块-标的对格式，动态生成列，按指定顺序排列"""
+def 转换为板块标的对格式(结果列表: List[dict]) -> Dict[str, List[str]]:
+    """新版：转换为板块-标的对格式，动态生成列，按指定顺序排列；按列返回以便直接写出CSV"""
     if not 结果列表:
-        return []
+        return {}
     
     # 统计所有数据中的最大板块-标的对数量
-    max_pairs = 0
-    for 数据 in 结果列表:
-        sector_pairs = 数据.get('sector_pairs', [])
-        if len(sector_pairs) > max_pairs:
-            max_pairs = len(sector_pairs)
+    max_pairs = max((len(数据.get('sector_pairs', [])) for 数据 in 结果列表), default=0)
     
     logger.info(f"检测到最大板块-标的对数量: {max_pairs}")
     
-    转换后结果 = []
+    标题列, 日期列, 时间列 = [], [], []
+    板块列 = [[] for _ in range(max_pairs)]
+    标的组合列 = [[] for _ in range(max_pairs)]
+    简述列, 理由列, 预期列, 原文列 = [], [], [], []
+    
     for 数据 in 结果列表:
-        日期时分 = 提取时分信息(数据)
-        
-        # 按新的列顺序构建数据，并加入完整的日期列
-        转换后数据 = {
-            '标题': 数据.get('title', ''),
-            '日期': 数据.get('date', ''), # YYYY-MM-DD
-            '时间': 日期时分,
-        }
+        标题列.append(数据.get('title', ''))
+        日期列.append(数据.get('date', ''))  # YYYY-MM-DD
+        时间列.append(数据.get('时分', ''))
         
-        # 动态添加板块-标的对列（按顺序）
+        # 板块-标的对（按顺序），不足 max_pairs 的位置补空
         sector_pairs = 数据.get('sector_pairs', [])
         for i in range(max_pairs):
             if i < len(sector_pairs):
                 板块, 标的组合 = sector_pairs[i]
                 # 将标的组合中的逗号改为顿号连接
-                标的组合_顿号 = 标的组合.replace(',', '、').replace('，', '、') if 标的组合 else ''
-                转换后数据[f'板块{i+1}'] = 板块
-                转换后数据[f'标的组合{i+1}'] = 标的组合_顿号
+                板块列[i].append(板块)
+                标的组合列[i].append(标的组合.replace(',', '、').replace('，', '、') if 标的组合 else '')
             else:
-                转换后数据[f'板块{i+1}'] = ''
-                转换后数据[f'标的组合{i+1}'] = ''
-        
-        # 最后添加固定的后续列
-        转换后数据.update({
-            '简述': 数据.get('brief', ''),
-            '推荐理由': 数据.get('reason', ''),
-            '预期': 数据.get('expectation', ''),
-            '原文': 数据.get('原文', '')
-        })
-        
-        转换后结果.append(转换后数据)
-    
-    return 转换后结果
-
-def 提取时分信息(数据: dict) -> str:
-    """从数据中提取时分信息"""
-    日期时分 = ''
-    try:
-        # 优先使用已提取的时分信息
-        日期时分 = 数据.get('时分', '')
-        
-        # 如果没有时分信息，尝试从create_time提取
-        if not 日期时分:
-            原始时间 = 数据.get('create_time', '')
-            if 原始时间 and 'T' in 原始时间:
-                时间部分 = 原始时间.split('T')[1]
-                if ':' in 时间部分:
-                    日期时分 = 时间部分[:5]  # HH:MM
+                板块列[i].append('')
+                标的组合列[i].append('')
         
-        # 如果仍然没有，尝试从date字段获取
-        if not 日期时分:
-            date_value = 数据.get('date', '')
-            if date_value and ':' in date_value:
-                日期时分 = date_value[:5] if len(date_value) >= 5 else date_value
-    except Exception as e:
-        logging.debug(f"解析时间失败: {e}")
-        日期时分 = ''
+        简述列.append(数据.get('brief', ''))
+        理由列.append(数据.get('reason', ''))
+        预期列.append(数据.get('expectation', ''))
+        原文列.append(数据.get('原文', ''))
     
-    return 日期时分
+    # 按新的列顺序组装：标题、日期、时间、各板块-标的对、固定的后续列
+    列数据: Dict[str, List[str]] = {'标题': 标题列, '日期': 日期列, '时间': 时间列}
+    for i in range(max_pairs):
+        列数据[f'板块{i+1}'] = 板块列[i]
+        列数据[f'标的组合{i+1}'] = 标的组合列[i]
+    列数据.update({'简述': 简述列, '推荐理由': 理由列, '预期': 预期列, '原文': 原文列})
+    return 列数据
 
-def 处理单个话题(话题: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def 提取话题文本(话题: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
-    处理单个话题的完整流程：文本提取 + LLM分析 + (可选)股价获取
+    处理流程第1步：从话题中提取结构化文本
     
     参数:
         话题 (Dict[str, Any]): 话题数据
         
     返回:
-        Optional[Dict[str, Any]]: 处理后的结果，如果无效则返回None
+        Optional[Dict[str, Any]]: 结构化数据，内容太短时返回None
     """
     try:
-        # 1. 文本提取
-        提取器 = TextExtractor(话题)
-        结构化数据 = 提取器.extract_all()
-        
-        if not 结构化数据:
-            # 获取话题标题用于日志
+        结构化数据 = TextExtractor.extract(话题)
+    except Exception as e:
+        logger.error("处理话题时出错: %s", e)
+        return None
+    
+    if not 结构化数据:
+        # 获取话题标题用于日志（只在DEBUG级别下才拼出标题）
+        if logger.isEnabledFor(logging.DEBUG):
             话题标题 = 话题.get("talk", {}).get("title", "")
             话题文本 = 话题.get("talk", {}).get("text", "")
             if not 话题标题:
                 话题标题 = 话题文本.split('\n')[0][:50] if 话题文本 else "无标题"
             
-            logger.debug(f"话题内容太短，跳过: {话题标题} (topic_id: {话题.get('topic_id', 'unknown')})")
-            return None
-        
-        logger.debug(f"开始LLM分析话题: {结构化数据['title'][:50]}...")
-        
-        # 2. LLM信息提取
-        数据 = extract_stock_info(结构化数据["summary"])
+            logger.debug("话题内容太短，跳过: %s (topic_id: %s)", 话题标题, 话题.get('topic_id', 'unknown'))
+        return None
+    
+    return 结构化数据
+
+def 可能含投资信息(结构化数据: Dict[str, Any]) -> bool:
+    """用关键词粗筛话题是否可能包含投资信息，不可能时无需调用LLM"""
+    return _投资关键词_RE.search(结构化数据["summary"]) is not None
+
+def _拼接股价(ticker_list: List[str], 价格表: Dict[str, str]) -> str:
+    """按标的顺序拼接前3个标的的价格，未获取到的位置留空"""
+    return ','.join(价格表.get(ticker) or "" for ticker in ticker_list[:3])
+
+def 处理LLM结果(话题: Dict[str, Any], 结构化数据: Dict[str, Any], 数据: Optional[dict]) -> Optional[Dict[str, Any]]:
+    """
+    处理流程第3步：校验LLM提取结果，映射股票代码，合并为最终结果
+    
+    参数:
+        话题 (Dict[str, Any]): 原始话题数据
+        结构化数据 (Dict[str, Any]): 第1步提取的结构化数据
+        数据 (Optional[dict]): 第2步LLM提取的结果
         
+    返回:
+        Optional[Dict[str, Any]]: 处理后的结果，如果无效则返回None
+    """
+    try:
         if not 数据:
-            logger.debug(f"LLM未能提取到有效信息: {结构化数据['title'][:30]}...")
-            logger.info(f"跳过话题 (LLM未提取到信息): {结构化数据['title']}")
-            logger.info(f"话题内容: {结构化数据['summary']}")
-            logger.info("=" * 80)
+            logger.debug("跳过话题 (LLM未提取到信息): %s | 内容: %s", 结构化数据['title'], 结构化数据['summary'])
             return None
         
         # 根据FINANCE模式处理不同的数据结构
@@ -243,56 +281,31 @@ def 处理单个话题(话题: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             # 兼容：旧版逻辑，检查target字段
             target_value = 数据.get('target', '')
             if not isinstance(target_value, str) or not target_value or target_value in ['', 'null', None]:
-                logger.debug(f"话题中未找到投资标的: {数据.get('title', '未知')}")
-                logger.info(f"跳过话题 (未找到投资标的): {结构化数据['title']}")
-                logger.info(f"话题内容: {结构化数据['summary']}")
-                logger.info("=" * 80)
+                logger.debug("跳过话题 (未找到投资标的): %s | 内容: %s", 结构化数据['title'], 结构化数据['summary'])
                 return None
                 
             # 兼容：股票代码映射和价格获取
             ticker_mappings = map_targets_to_tickers(target_value)
-            logger.debug(f"股票代码映射: {target_value} -> {ticker_mappings}")
+            logger.debug("股票代码映射: %s -> %s", target_value, ticker_mappings)
             
             ticker_list = [ticker for _, ticker in ticker_mappings if ticker]
             数据['ticker'] = ','.join(ticker_list) if ticker_list else ""
             
-            # 股价获取
-            if ticker_list:
-                price_list = []
-                for ticker in ticker_list[:3]:
-                    if ticker:
-                        logger.debug(f"正在获取股价: {ticker}")
-                        price = get_price(ticker)
-                        if price:
-                            price_list.append(price)
-                            logger.debug(f"获取到价格: {price}")
-                        else:
-                            price_list.append("")
-                            logger.debug(f"未能获取到{ticker}的价格")
-                    else:
-                        price_list.append("")
-                数据['price'] = ','.join(price_list) if price_list else ""
-            else:
-                数据['price'] = ""
+            # 股价由调用方在全部话题处理完后统一批量获取
+            数据['price'] = ""
         else:
             # 新版：板块-标的对模式，检查sector_pairs
             sector_pairs = 数据.get('sector_pairs', [])
             if not sector_pairs:
-                logger.debug(f"话题中未找到板块-标的对: {结构化数据['title'][:30]}...")
-                logger.info(f"跳过话题 (未找到板块-标的对): {结构化数据['title']}")
-                logger.info(f"话题内容: {结构化数据['summary']}")
-                logger.info("=" * 80)
+                logger.debug("跳过话题 (未找到板块-标的对): %s | 内容: %s", 结构化数据['title'], 结构化数据['summary'])
                 return None
         
         # 合并结构化数据和LLM提取的数据
         数据.update(结构化数据)
         
-        # 📝 从原始话题提取时间信息到数据中
-        原始时间 = 话题.get('create_time', '')
-        if 原始时间 and 'T' in 原始时间:
-            时间部分 = 原始时间.split('T')[1]
-            if ':' in 时间部分:
-                数据['时分'] = 时间部分[:5]  # HH:MM
+        # 📝 从原始话题提取时分信息（HH:MM），无法解析时为空，保存结果时直接读取
+        _, 分隔符, 时间部分 = 话题.get('create_time', '').partition('T')
+        数据['时分'] = 时间部分[:5] if 分隔符 and ':' in 时间部分 else ''
         
         # 添加原文内容
         数据['原文'] = 话题.get("talk", {}).get("text", "").strip()
@@ -301,25 +314,40 @@ def 处理单个话题(话题: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         标题 = 数据.get('title', 结构化数据.get('title', '未知标题')) or '未知标题'
         if FINANCE:
             标的 = 数据.get('target', '未知标的') or '未知标的'
-            logger.info(f"✅ 处理完成: {标题[:50]}... | 标的: {标的}")
+            logger.debug("✅ 处理完成: %.50s... | 标的: %s", 标题, 标的)
         else:
-            sector_pairs = 数据.get('sector_pairs', [])
-            板块信息 = f"{len(sector_pairs)}个板块-标的对" if sector_pairs else "无板块-标的对"
-            logger.info(f"✅ 处理完成: {标题[:50]}... | {板块信息}")
+            logger.debug("✅ 处理完成: %.50s... | %d个板块-标的对", 标题, len(数据.get('sector_pairs', [])))
         
         return 数据
         
     except Exception as e:
-        logger.error(f"处理话题时出错: {e}")
+        logger.error("处理话题时出错: %s", e)
         return None
 
 def 并发处理话题列表(话题列表: List[Dict[str, Any]], 最大工作线程: int = 5) -> List[Dict[str, Any]]:
+    """
+    并发处理话题列表（并发处理话题列表_async 的同步封装）
+    
+    参数:
+        话题列表 (List[Dict[str, Any]]): 要处理的话题列表
+        最大工作线程 (int): 处理LLM结果的最大并发线程数
+        
+    返回:
+        List[Dict[str, Any]]: 处理成功的结果列表
+    """
+    return asyncio.run(并发处理话题列表_async(话题列表, 最大工作线程))
+
+async def 并发处理话题列表_async(话题列表: List[Dict[str, Any]], 最大工作线程: int = 5) -> List[Dict[str, Any]]:
     """
     并发处理话题列表
     
+    先提取所有话题的文本，再把有效话题分批交给LLM（异步请求，每批合并为一次请求，多批并发），
+    然后用线程池处理LLM结果（股票代码映射是同步的），
+    FINANCE模式下最后把所有话题的标的合并为一次批量请求获取股价
+    
     参数:
         话题列表 (List[Dict[str, Any]]): 要处理的话题列表
-        最大工作线程 (int): 最大并发线程数
+        最大工作线程 (int): 处理LLM结果的最大并发线程数
         
     返回:
         List[Dict[str, Any]]: 处理成功的结果列表
@@ -330,37 +358,74 @@ def 并发处理话题列表(话题列表: List[Dict[str, Any]], 最大工作线
     logger.info(f"🚀 开始并发处理 {len(话题列表)} 个话题，使用 {最大工作线程} 个线程")
     logger.info("=" * 60)
     
+    # 1. 文本提取（内容太短或不含投资相关内容的话题在这里跳过，不进入LLM分析）
+    有效话题 = []
+    无关话题数 = 0
+    预筛选话题数 = 0
+    for 话题 in 话题列表:
+        结构化数据 = 提取话题文本(话题)
+        if not 结构化数据:
+            continue
+        预筛选话题数 += 1
+        if not 可能含投资信息(结构化数据):
+            无关话题数 += 1
+            logger.debug("跳过话题 (无投资相关内容): %s", 结构化数据['title'])
+            continue
+        有效话题.append((话题, 结构化数据))
+    已跳过 = len(话题列表) - len(有效话题)
+    if 已跳过:
+        logger.info(f"⏭️  跳过 {已跳过 - 无关话题数} 个内容太短、{无关话题数} 个无投资相关内容的话题")
+    if 预筛选话题数:
+        logger.info(f"🔍 关键词预筛选: 过滤 {无关话题数}/{预筛选话题数} 个话题 ({无关话题数 / 预筛选话题数:.1%})")
+    
+    # 2. LLM信息提取：分批合并请求，异步并发；耗时几乎都在这一步，进度条按完成的批次推进
+    logger.info(f"🧠 开始LLM分析 {len(有效话题)} 个有效话题")
+    with tqdm(total=len(话题列表), initial=已跳过, desc="LLM分析", unit="个") as 进度条:
+        try:
+            LLM结果列表 = await 批量提取(
+                [结构化数据["summary"] for _, 结构化数据 in 有效话题], 进度回调=进度条.update
+            )
+        except Exception as e:
+            logger.error(f"LLM批量提取失败: {e}")
+            LLM结果列表 = [None] * len(有效话题)
+    
+    # 3. 处理LLM结果：executor.map 按提交顺序返回结果，省去逐个任务的Future调度和完成通知
+    #    这一步很快，不显示进度；逐个话题的结果只记DEBUG日志
     with ThreadPoolExecutor(max_workers=最大工作线程) as executor:
-        # 提交所有任务
-        future_to_topic = {executor.submit(处理单个话题, 话题): 话题 for 话题 in 话题列表}
-        
-        # 收集结果
-        已完成 = 0
-        for future in as_completed(future_to_topic):
-            话题 = future_to_topic[future]
-            已完成 += 1
-            
-            try:
-                结果 = future.result()
-                if 结果:
-                    结果列表.append(结果)
-                    标题 = 结果.get('title', '未知标题')
-                    logger.info(f"📊 进度: {已完成}/{len(话题列表)} | ✅ 成功: {标题[:30]}...")
-                else:
-                    # 显示跳过话题的信息
-                    话题标题 = 话题.get("talk", {}).get("title", "")
-                    话题文本 = 话题.get("talk", {}).get("text", "")
-                    
-                    if not 话题标题:
-                        # 如果没有标题，从文本中获取第一行作为标题
-                        话题标题 = 话题文本.split('\n')[0][:50] if 话题文本 else "无标题"
-                    
-                    logger.info(f"📊 进度: {已完成}/{len(话题列表)} | ⏭️  跳过话题: {话题标题[:30]}...")
-            except Exception as e:
-                logger.error(f"📊 进度: {已完成}/{len(话题列表)} | ❌ 处理失败: {e}")
+        处理结果 = executor.map(
+            处理LLM结果,
+            [话题 for 话题, _ in 有效话题],
+            [结构化数据 for _, 结构化数据 in 有效话题],
+            LLM结果列表,
+        )
+        for (话题, _), 结果 in zip(有效话题, 处理结果):
+            if 结果:
+                结果列表.append(结果)
+                logger.debug("✅ 成功: %.30s...", 结果.get('title', '未知标题'))
+            elif logger.isEnabledFor(logging.DEBUG):
+                # 显示跳过话题的信息（只在DEBUG级别下才拼出标题）
+                话题标题 = 话题.get("talk", {}).get("title", "")
+                话题文本 = 话题.get("talk", {}).get("text", "")
+                
+                if not 话题标题:
+                    # 如果没有标题，从文本中获取第一行作为标题
+                    话题标题 = 话题文本.split('\n')[0][:50] if 话题文本 else "无标题"
+                
+                logger.debug("⏭️  跳过话题: %.30s...", 话题标题)
+
+    # 4. 股价获取：所有话题的标的去重后一次批量获取，而不是每个话题各自请求
+    if FINANCE and 结果列表:
+        各话题标的 = [结果['ticker'].split(',')[:3] if 结果.get('ticker') else [] for 结果 in 结果列表]
+        try:
+            价格表 = await get_prices_batch([ticker for 标的 in 各话题标的 for ticker in 标的])
+        except Exception as e:
+            logger.error(f"批量获取股价失败: {e}")
+            价格表 = {}
+        for 结果, 标的 in zip(结果列表, 各话题标的):
+            结果['price'] = _拼接股价(标的, 价格表)
     
     logger.info("=" * 60)
-    logger.info(f"🎯 并发处理完成！成功处理 {len(结果列表)} 个话题")
+    logger.info(f"🎯 并发处理完成！成功处理 {len(结果列表)} 个话题，LLM分析后跳过 {len(有效话题) - len(结果列表)} 个")
     logger.info("=" * 60)
     
     return 结果列表
@@ -391,6 +456,13 @@ def main():
     if not COOKIE or not STAR_ID:
         logging.error("必须在config.py中设置COOKIE和STAR_ID")
         return
+
+    # 本地再按日期过滤一次，避免时区边界上混入的更早话题进入LLM提取（create_time为北京时间）
+    目标日期 = 参数.from_date or 获取今日时间范围()[0][:10]
+    过滤前数量 = len(话题列表)
+    话题列表 = [话题 for 话题 in 话题列表 if 话题.get('create_time', '')[:10] >= 目标日期]
+    if len(话题列表) < 过滤前数量:
+        logger.info(f"按日期过滤掉{过滤前数量 - len(话题列表)}个早于{目标日期}的话题")
     
     if not 话题列表:
         if 参数.from_date:
@@ -425,6 +497,7 @@ def main():
             base_name = os.path.splitext(os.path.basename(csv_filepath))[0]
             excel_filepath = os.path.join(excel_reports_dir, f"{base_name}.xlsx")
             
+            from to_excel_converter import process_csv_to_excel  # 按需导入，避免启动时加载 pandas/openpyxl
             process_csv_to_excel(csv_filepath, excel_filepath)
             logger.info(f"✅ Excel文件自动转换成功！已保存至 {excel_filepath}")
         except Exception as e:
@@ -1,26 +1,48 @@
 import pandas as pd
 import os
 import argparse
+import csv
+import hashlib
 import logging
 import re
 from datetime import datetime
+from typing import List, Tuple
 from openpyxl import Workbook
-from openpyxl.cell import Cell
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.styles import Alignment, Font
+from openpyxl.styles import Alignment, Font, NamedStyle
 from openpyxl.utils import get_column_letter
 
+# 可选依赖：pyarrow 的多线程CSV解析器，未安装时回退到 pandas 默认解析器
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pa_csv = None
+    PYARROW_AVAILABLE = False
+
 # 设置一个简单的日志器
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 中文字符（按双倍宽度估算列宽）
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+# Excel版式版本：修改工作表结构或样式后需递增，使已生成的Excel按新版式重新生成
+EXCEL_FORMAT_VERSION = "1"
+
+# 输出文件名中的日期（会议纪要_YY.MM.DD）
+_FILE_DATE_PATTERN = re.compile(r'(\d{2}\.\d{2}\.\d{2})')
+# 旧版格式“日期”列中的时分（HH:MM）
+_TIME_OF_DAY_PATTERN = re.compile(r'\d{1,2}:\d{2}')
+
 def get_csv_format(df: pd.DataFrame) -> str:
     """
     根据DataFrame的列名检测CSV的格式
     """
     columns = df.columns.tolist()
-    if any(col.startswith('板块') for col in columns) or any(col.startswith('标的组合') for col in columns):
+    if any(col.startswith(('板块', '标的组合')) for col in columns):
         logger.info("检测到新版格式（板块-标的对）")
         return "new"
     if '价格1' in columns:
@@ -29,63 +51,179 @@ def get_csv_format(df: pd.DataFrame) -> str:
     logger.warning("未能明确识别CSV格式，将按默认（新版）格式处理")
     return "new"
 
-def auto_adjust_column_width_and_font(ws: Worksheet):
+# 各类列的命名样式（字体统一为等线13号，仅对齐方式不同），每个工作簿只注册一次
+_DENGXIAN_FONT = Font(name='等线', size=13)
+_COLUMN_STYLES = {
+    'body': Alignment(),
+    'body_center': Alignment(horizontal='center', vertical='center'),
+    'body_wrap_center': Alignment(vertical='center', wrap_text=True),
+    'body_wrap_top': Alignment(vertical='top', wrap_text=True),
+}
+
+# 表头 -> (命名样式, 固定列宽)；固定列宽为 None 时按内容估算。
+# 板块N、标的组合N 等动态列按去掉末尾序号后的名称查找，未列出的表头使用默认配置
+_DEFAULT_HEADER_CONFIG = ('body', None)
+_HEADER_CONFIG = {
+    '时间': ('body_center', None),
+    '板块': ('body_center', None),
+    '标题': ('body_wrap_center', 45),
+    '标的组合': ('body_wrap_center', 45),
+    '简述': ('body_wrap_top', 45),
+    '推荐理由': ('body_wrap_top', 45),
+    '预期': ('body_wrap_top', 45),
+    '原文': ('body', 666),
+}
+
+def _ensure_named_styles(wb: Workbook):
     """
-    自动调整列宽以适应内容，并根据CSV格式设置字体和对齐方式
+    在工作簿中注册列样式（已注册则跳过）
     """
-    dengxian_font = Font(name='等线', size=13)
-    
-    col_configs = {}
-    for idx, header_cell in enumerate(ws[1]):
-        header = str(header_cell.value) if header_cell.value is not None else ""
+    for name, alignment in _COLUMN_STYLES.items():
+        if name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=name, font=_DENGXIAN_FONT, alignment=alignment))
+
+def _display_width(text: str) -> float:
+    """
+    按 中文字符×2.1 + 其他字符×1.2 估算单个字符串的显示宽度（中文字符由正则一次性统计）
+    """
+    chinese_chars = len(_CJK_RE.findall(text))
+    return chinese_chars * 2.1 + (len(text) - chinese_chars) * 1.2
+
+def _estimate_column_width(header: str, values: pd.Series) -> float:
+    """
+    估算一列（含表头）的最大显示宽度，数据部分使用pandas向量化计算，规则同 _display_width
+    """
+    s = values.dropna().astype(str)
+    s = s[s != '']
+    widths = [_display_width(header)]
+    if not s.empty:
+        lengths = s.str.len()
+        chinese_chars = s.str.count(_CJK_RE)
+        widths.append((chinese_chars * 2.1 + (lengths - chinese_chars) * 1.2).max())
+    return max(widths)
+
+def auto_adjust_column_width_and_font(ws: Worksheet, df: pd.DataFrame) -> List[str]:
+    """
+    自动调整列宽以适应内容，并根据CSV格式确定各列的字体和对齐方式
+
+    列宽直接从待写入的DataFrame向量化计算。工作表为只写模式，
+    须在追加任何行之前调用；返回各列对应的命名样式，供写入单元格时使用
+    """
+    _ensure_named_styles(ws.parent)
+
+    style_names = []
+    for idx, header in enumerate(df.columns):
+        header = str(header) if header is not None else ""
         col_letter = get_column_letter(idx + 1)
-        
-        config = {'alignment': Alignment(), 'width': None}
-        
-        if header == '时间' or header.startswith('板块'):
-            config['alignment'] = Alignment(horizontal='center', vertical='center')
-        elif header == '标题' or header.startswith('标的组合'):
-            config['alignment'] = Alignment(vertical='center', wrap_text=True)
-            config['width'] = 45
-        elif header in ['简述', '推荐理由', '预期']:
-            config['alignment'] = Alignment(vertical='top', wrap_text=True)
-            config['width'] = 45
-        elif header == '原文':
-            config['width'] = 666
-
-        col_configs[col_letter] = config
-
-    for row in ws.iter_rows():
-        for cell in row:
-            if isinstance(cell, Cell):
-                cell.font = dengxian_font
-                if cell.column_letter in col_configs:
-                    cell.alignment = col_configs[cell.column_letter]['alignment']
-
-    for col_letter, config in col_configs.items():
-        if config['width']:
-            ws.column_dimensions[col_letter].width = config['width']
-        else:
-            max_length = 0
-            for cell in ws[col_letter]:
-                if cell.value:
-                    cell_value = str(cell.value)
-                    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', cell_value))
-                    other_chars = len(cell_value) - chinese_chars
-                    estimated_width = chinese_chars * 2.1 + other_chars * 1.2
-                    if estimated_width > max_length:
-                        max_length = estimated_width
-            adjusted_width = min(max(max_length + 4, 12), 60)
-            ws.column_dimensions[col_letter].width = adjusted_width
+
+        style_name, width = _HEADER_CONFIG.get(header.rstrip('0123456789'), _DEFAULT_HEADER_CONFIG)
+        style_names.append(style_name)
+
+        if width is None:
+            width = min(max(_estimate_column_width(header, df.iloc[:, idx]) + 4, 12), 60)
+        ws.column_dimensions[col_letter].width = width
             
     ws.freeze_panes = 'A2'
+    return style_names
+
+def _append_styled_rows(ws: Worksheet, df: pd.DataFrame, style_names: List[str]):
+    """
+    以只写模式逐行追加表头和数据，每个单元格包装为带样式的 WriteOnlyCell
+    """
+    def styled_row(values) -> list:
+        row = []
+        for value, style_name in zip(values, style_names):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style_name
+            row.append(cell)
+        return row
+
+    ws.append(styled_row(df.columns))
+    # NaN 统一写为空单元格
+    values = df.astype(object).where(df.notna(), None)
+    for values_row in values.itertuples(index=False, name=None):
+        ws.append(styled_row(values_row))
+
+def _read_csv(input_csv: str) -> pd.DataFrame:
+    """
+    读取CSV，所有列均按字符串读取（保留股票代码前导零、时分不被解析为时间），空单元格为缺失值
+
+    优先使用 pyarrow 直接读取（显式指定列类型，跳过类型推断），未安装时回退到 pandas 默认引擎
+    """
+    if PYARROW_AVAILABLE:
+        with open(input_csv, encoding='utf-8-sig', newline='') as f:
+            header = next(csv.reader(f), [])
+        convert_options = pa_csv.ConvertOptions(
+            column_types={column: pa.string() for column in header},
+            strings_can_be_null=True,
+        )
+        return pa_csv.read_csv(input_csv, convert_options=convert_options).to_pandas()
+    return pd.read_csv(input_csv, encoding='utf-8-sig', dtype=str)
+
+def _base_date_from_filename(input_csv: str) -> datetime:
+    """
+    从 会议纪要_YY.MM.DD.csv 形式的文件名中解析日期，解析失败时使用今天
+    """
+    match = _FILE_DATE_PATTERN.search(os.path.basename(input_csv))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), '%y.%m.%d')
+        except ValueError:
+            pass
+    return datetime.now()
+
+def _resolve_sheet_dates(df: pd.DataFrame, input_csv: str) -> Tuple[pd.Series, bool]:
+    """
+    计算每行所属的工作表日期（YYYY-MM-DD）
+
+    旧版格式的“日期”列只有时分（HH:MM），此时以文件名中的日期为基准拼接，
+    整列一次性向量化处理，而不是逐行拼接字符串。
+    返回 (各行日期, “日期”列是否实为时分)；空值保持为NA，分组时会被跳过
+    """
+    date_str = df['日期'].astype('string').str.strip()
+    is_time = date_str.str.fullmatch(_TIME_OF_DAY_PATTERN).fillna(False).astype(bool)
+    if not is_time.any():
+        return date_str, False
+
+    date_prefix = _base_date_from_filename(input_csv).strftime('%Y-%m-%d') + ' '
+    full_date = pd.to_datetime(date_prefix + date_str, format='%Y-%m-%d %H:%M', errors='coerce')
+    return date_str.mask(is_time, full_date.dt.strftime('%Y-%m-%d')), True
+
+def _compute_source_hash(input_csv: str) -> str:
+    """
+    计算CSV内容（连同Excel版式版本）的sha256，用于判断Excel是否需要重新生成
+    """
+    digest = hashlib.sha256()
+    with open(input_csv, 'rb') as f:
+        # 分块读取（hashlib.file_digest 需要 Python 3.11+）
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(EXCEL_FORMAT_VERSION.encode('ascii'))
+    return digest.hexdigest()
+
+def _is_excel_up_to_date(output_excel: str, source_hash: str) -> bool:
+    """
+    Excel文件存在且旁边的 .sha256 记录与当前CSV哈希一致时，视为无需重新生成
+    """
+    hash_path = output_excel + '.sha256'
+    if not (os.path.exists(output_excel) and os.path.exists(hash_path)):
+        return False
+    with open(hash_path, encoding='ascii') as f:
+        return f.read().strip() == source_hash
 
 def process_csv_to_excel(input_csv: str, output_excel: str):
     """
     将CSV文件转换为按日期分sheet的、格式化的Excel文件
+
+    CSV内容与上次转换时相同（按 .sha256 旁路文件判断）则跳过转换
     """
     try:
-        df = pd.read_csv(input_csv, encoding='utf-8-sig')
+        source_hash = _compute_source_hash(input_csv)
+        if _is_excel_up_to_date(output_excel, source_hash):
+            logger.info(f"✅ Excel文件已是最新，跳过转换: {output_excel}")
+            return
+
+        df = _read_csv(input_csv)
         if df.empty:
             logger.warning(f"CSV文件为空: {input_csv}")
             return
@@ -96,25 +234,34 @@ def process_csv_to_excel(input_csv: str, output_excel: str):
             logger.error(f"CSV文件 {input_csv} 中缺少“日期”列，无法按日期分表。")
             return
 
-        grouped = df.groupby('日期')
-        wb = Workbook()
-        if wb.active:
-            wb.remove(wb.active)
+        # 只计算一次各日期的行号，并只去掉一次“日期”列，各分组直接按行号切片
+        sheet_dates, date_is_time = _resolve_sheet_dates(df, input_csv)
+        group_indices = sheet_dates.groupby(sheet_dates).indices
+        if date_is_time:
+            # 旧版格式的“日期”实际是时分，保留为“时间”列
+            body = df.rename(columns={'日期': '时间'})
+        else:
+            body = df.drop(columns=['日期'])
+        # 旧的哈希记录先删除，转换中途失败时不会把不完整的Excel误判为最新
+        hash_path = output_excel + '.sha256'
+        if os.path.exists(hash_path):
+            os.remove(hash_path)
+        # 只写模式：行直接流式写入，不在内存中保留可编辑的单元格对象
+        wb = Workbook(write_only=True)
 
-        for date_group, data in sorted(grouped, key=lambda x: str(x[0]), reverse=True):
+        for date_group in sorted(group_indices, key=str, reverse=True):
             sheet_name = str(date_group)
             ws = wb.create_sheet(title=sheet_name)
             
-            data_to_write = data.copy().drop(columns=['日期'])
-            
-            ws.append(list(data_to_write.columns))
-            for _, row in data_to_write.iterrows():
-                ws.append(list(row))
+            data_to_write = body.iloc[group_indices[date_group]]
             
-            auto_adjust_column_width_and_font(ws)
-            logger.info(f"✅ 已创建工作表: {sheet_name} ({len(data)} 行)")
+            style_names = auto_adjust_column_width_and_font(ws, data_to_write)
+            _append_styled_rows(ws, data_to_write, style_names)
+            logger.info(f"✅ 已创建工作表: {sheet_name} ({len(data_to_write)} 行)")
             
         wb.save(output_excel)
+        with open(hash_path, 'w', encoding='ascii') as f:
+            f.write(source_hash)
         logger.info(f"🎉 Excel文件已生成: {output_excel}")
 
     except Exception as e:
@@ -137,13 +284,15 @@ if __name__ == "__main__":
             logger.error(f"源目录不存在: {source_dir}。请先运行main.py生成数据。")
             exit(1)
 
-        csv_files = [os.path.join(source_dir, f) for f in os.listdir(source_dir) if f.endswith('.csv')]
+        # scandir 的 DirEntry 复用目录读取时的信息，比 listdir + getmtime 少一次路径查找
+        with os.scandir(source_dir) as it:
+            csv_entries = [entry for entry in it if entry.name.endswith('.csv')]
         
-        if not csv_files:
+        if not csv_entries:
             logger.error(f"在 {source_dir} 目录中未找到任何CSV文件。")
             exit(1)
             
-        latest_file = max(csv_files, key=os.path.getmtime)
+        latest_file = max(csv_entries, key=lambda entry: entry.stat().st_mtime).path
         logger.info(f"找到最新的CSV文件: {latest_file}")
         input_path = latest_file
     
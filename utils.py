@@ -1,30 +1,49 @@
+import atexit
+import json
 import logging
 import os
+import queue
 import time
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 
 from config import LOG_LEVEL, MAX_LOG_FILES
 
+# 统一的JSON解析函数：orjson 更快且直接接受 bytes，未安装时回退到 json
+# （orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方统一捕获 json.JSONDecodeError / ValueError 即可）
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# 文件日志缓冲的记录条数：攒满一批或遇到ERROR及以上级别时才写盘
+LOG_BUFFER_CAPACITY = 1024
+
+# 已配置的日志文件路径，重复调用 setup_logging 时直接返回，不再重新清理和创建文件
+_configured_log_path: Optional[str] = None
+
 def _cleanup_logs(log_dir: str, max_files: int):
     """清理旧的日志文件，只保留最新的 max_files 个文件"""
     if not os.path.exists(log_dir):
         return
     
     try:
-        files = [os.path.join(log_dir, f) for f in os.listdir(log_dir) if f.endswith('.log')]
-        if len(files) <= max_files:
+        # scandir 的 DirEntry 复用目录读取时的信息，每个文件只需一次 stat
+        with os.scandir(log_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith('.log') and entry.is_file()]
+        if len(entries) <= max_files:
             return
 
-        # 按修改时间排序，最旧的在前
-        files.sort(key=lambda x: os.path.getmtime(x))
+        # 按修改时间排序，最新的在前
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
 
-        # 删除多余的旧文件
-        files_to_delete = files[:-max_files]
-        for f in files_to_delete:
-            os.remove(f)
-            # 使用 print 因为此时 logger 可能还未完全设置好
-            print(f"Removed old log file: {f}")
+        # 删除多余的旧文件，结束后汇总输出一次
+        old_entries = entries[max_files:]
+        for entry in old_entries:
+            os.remove(entry.path)
+        # 使用 print 因为此时 logger 可能还未完全设置好
+        print(f"Removed {len(old_entries)} old log file(s) from {log_dir}")
     except Exception as e:
         print(f"Error cleaning up log files: {e}")
 
@@ -32,9 +51,15 @@ def setup_logging() -> Optional[str]:
     """
     配置全局日志系统，包括文件输出和自动清理。
     
+    重复调用时直接返回首次配置的日志文件路径。
+    
     Returns:
         Optional[str]: 日志文件的路径，如果设置失败则返回 None。
     """
+    global _configured_log_path
+    if _configured_log_path:
+        return _configured_log_path
+
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
 
@@ -54,6 +79,10 @@ def setup_logging() -> Optional[str]:
         log_filepath, maxBytes=5*1024*1024, backupCount=5, encoding='utf-8'
     )
     file_handler.setFormatter(log_formatter)
+    # 缓冲文件写入，避免每条日志都单独write+flush；进程退出时 logging.shutdown 会关闭并刷出剩余记录
+    buffered_file_handler = MemoryHandler(
+        LOG_BUFFER_CAPACITY, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True
+    )
 
     # 控制台处理器
     console_handler = logging.StreamHandler()
@@ -67,9 +96,18 @@ def setup_logging() -> Optional[str]:
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
         
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # 工作线程只把日志记录放入队列，由后台监听线程统一写文件和控制台，避免并发时阻塞在I/O上
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, buffered_file_handler, console_handler, respect_handler_level=True
+    )
+    listener.start()
+    # 退出时先停止监听线程（处理完队列中剩余记录），再由 logging.shutdown 刷出文件缓冲
+    atexit.register(listener.stop)
+
+    root_logger.addHandler(QueueHandler(log_queue))
 
+    _configured_log_path = log_filepath
     logging.info(f"日志系统设置完成，日志将记录到: {log_filepath}")
     return log_filepath
 